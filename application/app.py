@@ -1,16 +1,367 @@
+import atexit
 import flask
-from typing import Tuple, Any, Dict, List, Optional
-from sqlalchemy import select, Select
+import hmac
+import io
+import queue
+from typing import Tuple, Any, Dict, List, Optional, Iterator, Callable, Set
+from sqlalchemy import select, Select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 import datetime
 
-from application.models import User, UserMessage, UserProfile, MAIN_SESSION, Base, ENGINE
+from application import config
+from application.models import User, UserMessage, UserProfile, MAIN_SESSION, ENGINE
+from application.migrations import migrate
+from application.events import NOTIFIER, BROKER, Subscription
+from application.search import search_users, search_messages, highlight_snippet
+from application.writer import MessageWriter
+from application.presence import PresenceTracker
+from application.sessions import SessionInfo, SessionStore
+from application.compression import CompressionCache, compress, encoded_etag, etag_variants, negotiate_encoding
+from application.serialization import FastJSONProvider, FragmentCache, RawJSON
+from application.ingest import Item, array_items, ndjson_items, ingest_messages, ingest_users
 
 app: flask.Flask = flask.Flask(__name__)
 """Экземпляр Flask-приложения."""
 
+app.json = FastJSONProvider(app)
+"""Сериализация JSON через orjson, если он установлен."""
+
+MESSAGES_PAGE_LIMIT: int = 500
+"""Максимальное количество сообщений в одном ответе /messages и /history."""
+
+HISTORY_PAGE_SIZE: int = 50
+"""Количество сообщений на странице /history по умолчанию."""
+
+SEARCH_PAGE_SIZE: int = 20
+"""Количество результатов поиска на странице по умолчанию."""
+
+SEARCH_PAGE_LIMIT: int = 100
+"""Максимальное количество результатов поиска на странице."""
+
+LONG_POLL_TIMEOUT: int = 25
+"""Время ожидания изменений в /updates по умолчанию, в секундах."""
+
+LONG_POLL_MAX_TIMEOUT: int = 60
+"""Максимально допустимое время ожидания изменений в /updates, в секундах."""
+
+STREAM_KEEPALIVE: int = 15
+"""Интервал отправки keep-alive комментариев в /stream, в секундах."""
+
+STREAM_RETRY_MS: int = 2000
+"""Задержка переподключения к /stream после обрыва, передаваемая клиенту в поле retry, в миллисекундах."""
+
+ROWS_FORMAT: str = 'rows'
+"""
+Значение параметра format, при котором данные возвращаются записями
+(по одной на пользователя или сообщение) вместо параллельных массивов.
+"""
+
+COMPRESSED_BODIES: CompressionCache = CompressionCache(config.COMPRESSION_CACHE_SIZE)
+"""Кэш сжатых тел ответов с ETag (снимков /, /users и т. п.)."""
+
+MESSAGE_FRAGMENTS: FragmentCache = FragmentCache(config.MESSAGE_FRAGMENT_CACHE_SIZE)
+"""Сообщения, сериализованные в JSON, по ID (сообщения не изменяются после сохранения)."""
+
+FRAGMENT_FETCH_CHUNK: int = 500
+"""
+Количество отсутствующих в кэше сообщений, до которого они выбираются по списку ID;
+при большем количестве они выбираются по диапазону ID.
+"""
+
 with app.app_context():
-    Base.metadata.create_all(bind=ENGINE)
-"""Создание таблиц в БД"""
+    migrate(ENGINE)
+    with MAIN_SESSION() as startup_session:
+        NOTIFIER.message_added(startup_session.scalar(select(func.max(UserMessage.id))) or 0)
+"""Миграция схемы БД и восстановление ID последнего сообщения"""
+
+
+def serialize_message(message: UserMessage) -> Dict[str, Any]:
+    """
+    Преобразует сообщение в словарь для JSON-ответа.
+
+    Args:
+        message: Сообщение из базы данных
+
+    Returns:
+        Dict[str, Any]: Идентификатор, отправитель, текст и дата сообщения
+    """
+    return {
+        'id': message.id,
+        'sender': message.user_name,
+        'message': message.message,
+        'date': message.date
+    }
+
+
+def serialize_presence(user_id: int, username: str, user_info: str, state: bool) -> Dict[str, Any]:
+    """
+    Формирует данные события об изменении статуса пользователя.
+
+    Args:
+        user_id: ID пользователя
+        username: Имя пользователя
+        user_info: Информация о пользователе
+        state: Статус пользователя (online/offline)
+
+    Returns:
+        Dict[str, Any]: Данные пользователя для события 'presence'
+    """
+    return {'id': user_id, 'name': username, 'info': user_info, 'state': state}
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """
+    Форматирует событие в формате Server-Sent Events.
+
+    Args:
+        event: Тип события
+        data: Данные события
+        event_id: ID события, по которому клиент возобновит поток
+
+    Returns:
+        str: Текст события для потока text/event-stream
+    """
+    lines: List[str] = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {app.json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def publish_records(records: List[Dict[str, Any]]) -> None:
+    """
+    Сообщает ожидающим запросам и подписчикам /stream о сохраненных сообщениях.
+
+    Args:
+        records: Сообщения в формате serialize_message() после фиксации транзакции, по возрастанию ID
+    """
+    MESSAGE_FRAGMENTS.put_many({record['id']: app.json.dumps(record) for record in records})
+    NOTIFIER.message_added(records[-1]['id'])
+    for record in records:
+        BROKER.publish('message', record)
+
+
+def publish_messages(new_messages: List[UserMessage]) -> None:
+    """
+    Сообщает ожидающим запросам и подписчикам /stream о сохраненных сообщениях.
+
+    Args:
+        new_messages: Сообщения после фиксации транзакции, по возрастанию ID
+    """
+    publish_records([serialize_message(message) for message in new_messages])
+
+
+def publish_presence(user_ids: List[int], state: bool) -> List[Dict[str, Any]]:
+    """
+    Сообщает об изменении статусов пользователей.
+
+    Args:
+        user_ids: ID пользователей, статус которых изменился
+        state: Новый статус (online/offline)
+
+    Returns:
+        List[Dict[str, Any]]: Данные найденных пользователей, разосланные подписчикам /stream
+    """
+    with MAIN_SESSION() as session:
+        rows = session.execute(
+            select(User.id, User.username, UserProfile.user_info)
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .where(User.id.in_(user_ids))
+        ).all()
+
+    records: List[Dict[str, Any]] = [
+        serialize_presence(row.id, row.username, row.user_info or '', state) for row in rows
+    ]
+    if records:
+        NOTIFIER.users_changed()
+        for record in records:
+            BROKER.publish('presence', record)
+    return records
+
+
+def presence_expired(user_ids: List[int]) -> None:
+    """
+    Рассылает статус «не в сети» пользователям, которые перестали присылать heartbeat.
+
+    Args:
+        user_ids: ID пользователей с истекшим сроком статуса
+    """
+    publish_presence(user_ids, False)
+
+
+def publish_users(records: List[Dict[str, Any]]) -> None:
+    """
+    Сообщает об изменении списка пользователей и рассылает их статусы подписчикам /stream.
+
+    Args:
+        records: Пользователи в формате serialize_presence()
+    """
+    NOTIFIER.users_changed()
+    for record in records:
+        BROKER.publish('presence', record)
+
+
+PRESENCE: PresenceTracker = PresenceTracker(config.PRESENCE_TTL, on_expire=presence_expired)
+"""Статусы пользователей в сети, обновляемые heartbeat-запросами клиентов."""
+
+SESSIONS: SessionStore = SessionStore(
+    MAIN_SESSION,
+    max_size=config.SESSION_CACHE_SIZE,
+    cache_ttl=config.SESSION_CACHE_TTL,
+    lifetime=datetime.timedelta(days=config.SESSION_LIFETIME_DAYS)
+)
+"""Токены сессий пользователей с кэшем в памяти."""
+
+MESSAGE_WRITER: MessageWriter = MessageWriter(
+    MAIN_SESSION,
+    publish_messages,
+    batch_size=config.WRITE_BATCH_SIZE,
+    max_delay=config.WRITE_BATCH_DELAY_MS / 1000
+)
+"""Фоновая запись сообщений группами для /send_message."""
+
+atexit.register(MESSAGE_WRITER.stop)
+
+
+def wants_rows() -> bool:
+    """
+    Проверяет, запросил ли клиент ответ в виде записей.
+
+    Returns:
+        bool: True для format=rows, False для прежнего формата параллельных массивов
+    """
+    return flask.request.args.get('format') == ROWS_FORMAT
+
+
+@app.after_request
+def compress_response(response: flask.Response) -> flask.Response:
+    """
+    Сжимает тело ответа gzip или deflate, если клиент это поддерживает.
+
+    Сжимаются только готовые (не потоковые) ответы 200 не меньше
+    config.COMPRESSION_MIN_SIZE байт. Тела ответов с ETag кэшируются
+    в COMPRESSED_BODIES, поэтому один и тот же снимок данных не сжимается
+    заново для каждого клиента. К ETag сжатого ответа добавляется способ
+    сжатия, чтобы сжатое и несжатое представления различались.
+
+    Args:
+        response: Ответ обработчика запроса
+
+    Returns:
+        flask.Response: Ответ, при необходимости сжатый
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.content_length is None
+            or response.content_length < config.COMPRESSION_MIN_SIZE):
+        return response
+
+    encoding: Optional[str] = negotiate_encoding(flask.request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+
+    etag, _ = response.get_etag()
+    key: Optional[Tuple[str, str, str]] = (flask.request.full_path, etag, encoding) if etag else None
+    body: Optional[bytes] = COMPRESSED_BODIES.get(key) if key else None
+    if body is None:
+        body = compress(response.get_data(), encoding, config.COMPRESSION_LEVEL)
+        if key:
+            COMPRESSED_BODIES.put(key, body)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def bearer_token() -> Optional[str]:
+    """
+    Возвращает токен сессии из заголовка Authorization: Bearer.
+
+    Returns:
+        Optional[str]: Токен или None, если заголовка нет
+    """
+    scheme, _, token = flask.request.headers.get('Authorization', '').partition(' ')
+    return token.strip() if scheme.lower() == 'bearer' else None
+
+
+def admin_authorized() -> bool:
+    """
+    Проверяет токен администратора в заголовке Authorization: Bearer.
+
+    Returns:
+        bool: True, если задан config.ADMIN_TOKEN и токен запроса с ним совпадает
+    """
+    token: Optional[str] = bearer_token()
+    return bool(config.ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, config.ADMIN_TOKEN)
+
+
+def forbidden() -> Tuple[flask.Response, int]:
+    """
+    Формирует ответ на запрос импорта без токена администратора.
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с ошибкой и HTTP-статус 403
+    """
+    return flask.jsonify({'answer': False, 'error': 'Импорт доступен только администратору'}), 403
+
+
+def unauthorized() -> Tuple[flask.Response, int]:
+    """
+    Формирует ответ на запрос без действующего токена сессии.
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с ошибкой и HTTP-статус 401
+    """
+    return flask.jsonify({'answer': False, 'error': 'Требуется вход в систему'}), 401
+
+
+def session_answer(info: SessionInfo, token: str) -> Dict[str, Any]:
+    """
+    Формирует ответ на успешный вход или регистрацию.
+
+    Args:
+        info: Данные пользователя
+        token: Токен сессии
+
+    Returns:
+        Dict[str, Any]: Данные пользователя и токен сессии
+    """
+    return {
+        'answer': True,
+        'main_id': info.user_id,
+        'main_name': info.username,
+        'main_info': info.user_info,
+        'token': token
+    }
+
+
+def conditional_json(etag: str, build: Callable[[], Dict[str, Any]]) -> Tuple[flask.Response, int]:
+    """
+    Возвращает JSON-ответ с ETag или 304, если данные у клиента актуальны.
+
+    При совпадении If-None-Match с ETag любого представления ответа
+    (несжатого или сжатого) функция build не вызывается,
+    поэтому обращения к базе данных не происходит.
+
+    Args:
+        etag: ETag текущего состояния данных
+        build: Функция, формирующая данные ответа
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ или пустой ответ 304 и HTTP-статус
+    """
+    for tag in etag_variants(etag):
+        if flask.request.if_none_match.contains(tag):
+            response: flask.Response = flask.Response(status=304)
+            response.set_etag(tag)
+            return response, 304
+
+    response = flask.jsonify(build())
+    response.set_etag(etag)
+    return response, 200
 
 
 @app.route('/register', methods=['POST'])
@@ -18,8 +369,13 @@ def registration() -> Tuple[flask.Response, int]:
     """
     Регистрирует нового пользователя в системе.
 
+    ID пользователя берется из вставленной строки, а уникальность имени
+    обеспечивает уникальный индекс: занятое имя отклоняется базой данных
+    без предварительной проверки, в том числе при одновременной регистрации.
+
     Returns:
-        Tuple[flask.Response, int]: JSON-ответ с данными пользователя и HTTP-статус
+        Tuple[flask.Response, int]: JSON-ответ с данными пользователя, токеном сессии
+            и HTTP-статус (409, если имя уже занято)
 
     Example JSON request:
         {
@@ -43,23 +399,35 @@ def registration() -> Tuple[flask.Response, int]:
         )
         session.add(new_user)
         session.add(new_user_profile)
-        session.commit()
+        try:
+            session.flush()
+            user_id: int = new_user.id
+            info = SessionInfo(user_id, username, user_info)
+            token: str = SESSIONS.create(session, info)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return flask.jsonify({
+                'answer': False,
+                'main_id': 0,
+                'error': 'Имя пользователя уже занято'
+            }), 409
 
-        selected: Select = select(User.id).order_by(User.id.desc())
-        user_id: int = session.scalars(selected).first()
+        PRESENCE.touch(user_id)
+        NOTIFIER.users_changed()
+        BROKER.publish('presence', serialize_presence(user_id, username, user_info, True))
 
-        return flask.jsonify({
-            'answer': True,
-            'main_id': user_id,
-            'main_name': username,
-            'main_info': user_info,
-        }), 200
+        return flask.jsonify(session_answer(info, token)), 200
 
 
 @app.route('/login', methods=['GET'])
 def login() -> Tuple[flask.Response, int]:
     """
-    Аутентифицирует пользователя в системе.
+    Аутентифицирует пользователя в системе и отмечает его в сети.
+
+    При успешной проверке пароля выдается токен сессии, который клиент
+    передает в заголовке Authorization: Bearer. Повторный вход с действующим
+    токеном того же пользователя не обращается к базе данных.
 
     Returns:
         Tuple[flask.Response, int]: JSON-ответ с результатом аутентификации и HTTP-статус
@@ -69,34 +437,43 @@ def login() -> Tuple[flask.Response, int]:
             "username": "john_doe",
             "password": "secret_password"
         }
+
+    Example JSON response:
+        {
+            "answer": true,
+            "main_id": 1,
+            "main_name": "john_doe",
+            "main_info": "...",
+            "token": "..."
+        }
     """
     data: Dict[str, Any] = flask.request.json
     username: str = data.get('username', '')
     password: str = data.get('password', '')
 
-    result: Dict[str, Any] = {'answer': False, 'main_id': 0}
+    token: Optional[str] = bearer_token()
+    info: Optional[SessionInfo] = SESSIONS.resolve(token)
 
-    with MAIN_SESSION() as session:
-        user: Optional[User] = session.scalar(
-            select(User).where(User.username == username)
-        )
+    if info is None or info.username != username:
+        with MAIN_SESSION() as session:
+            row = session.execute(
+                select(User.id, UserProfile.user_info, UserProfile.user_password)
+                .join(UserProfile, UserProfile.user_id == User.id)
+                .where(User.username == username)
+            ).first()
 
-        if user:
-            user_profile: Optional[UserProfile] = session.scalar(
-                select(UserProfile).where(UserProfile.user_id == user.id)
-            )
-
-            if user_profile and user_profile.user_password == password:
-                result.update({
-                    'answer': True,
-                    'main_id': user_profile.user_id,
-                    'main_name': username,
-                    'main_info': user_profile.user_info
-                })
-                user_profile.user_state = True
-                session.commit()
+            if row is None or row.user_password != password:
+                return flask.jsonify({'answer': False, 'main_id': 0}), 200
 
-    return flask.jsonify(result), 200
+            info = SessionInfo(row.id, username, row.user_info)
+            token = SESSIONS.create(session, info)
+            session.commit()
+
+    if PRESENCE.touch(info.user_id):
+        NOTIFIER.users_changed()
+        BROKER.publish('presence', serialize_presence(info.user_id, username, info.user_info, True))
+
+    return flask.jsonify(session_answer(info, token)), 200
 
 
 @app.route('/', methods=['GET'])
@@ -104,76 +481,716 @@ def index() -> Tuple[flask.Response, int]:
     """
     Возвращает основную информацию о всех пользователях и сообщениях.
 
+    Данные выбираются двумя запросами: пользователи вместе с профилями и сообщения.
+    В формате rows сообщения берутся из MESSAGE_FRAGMENTS уже сериализованными,
+    из базы данных читаются только ID и отсутствующие в кэше сообщения.
+    Ответ содержит ETag с версией данных; на запрос с совпадающим
+    If-None-Match возвращается 304 без обращения к базе данных.
+
+    Query parameters:
+        format: 'rows' — записи пользователей и сообщений; иначе прежний формат
+            с параллельными массивами для старых клиентов
+
     Returns:
         Tuple[flask.Response, int]: JSON-ответ с данными системы и HTTP-статус
+
+    Example JSON response (format=rows):
+        {
+            "users": [{"id": 1, "name": "john_doe", "info": "...", "state": true}],
+            "messages": [{"id": 42, "sender": "john_doe", "message": "Привет", "date": "..."}]
+        }
+    """
+    rows_format: bool = wants_rows()
+
+    def build() -> Dict[str, Any]:
+        """Выбирает все данные чата из базы данных."""
+        with MAIN_SESSION() as session:
+            records: List[Dict[str, Any]] = user_records(session)
+            if rows_format:
+                ids: List[int] = session.scalars(select(UserMessage.id).order_by(UserMessage.id)).all()
+                return {'users': records, 'messages': message_array(session, ids)}
+
+            all_messages = session.execute(
+                select(UserMessage.message, UserMessage.user_name).order_by(UserMessage.id)
+            ).all()
+
+        return {
+            **legacy_users(records),
+            'messages': [message.message for message in all_messages],
+            'sender_users': [message.user_name for message in all_messages]
+        }
+
+    etag: str = NOTIFIER.etag()
+    return conditional_json(f'{etag}-{ROWS_FORMAT}' if rows_format else etag, build)
+
+
+def message_array(session: Session, ids: List[int]) -> RawJSON:
+    """
+    Формирует JSON-массив сообщений из кэша сериализованных сообщений.
+
+    Сообщения, которых нет в MESSAGE_FRAGMENTS, выбираются из базы данных,
+    сериализуются и сохраняются в кэше. Небольшое количество отсутствующих
+    сообщений выбирается по ID, большое — одним запросом по диапазону ID.
+
+    Args:
+        session: Сессия базы данных
+        ids: ID сообщений в порядке вывода
+
+    Returns:
+        RawJSON: Массив сообщений в формате serialize_message()
+    """
+    fragments: List[Optional[str]] = MESSAGE_FRAGMENTS.get_many(ids)
+    missing: List[int] = [message_id for message_id, fragment in zip(ids, fragments) if fragment is None]
+
+    if missing:
+        query: Select = select(UserMessage.id, UserMessage.user_name, UserMessage.message, UserMessage.date)
+        if len(missing) > FRAGMENT_FETCH_CHUNK:
+            query = query.where(UserMessage.id.between(min(missing), max(missing)))
+        else:
+            query = query.where(UserMessage.id.in_(missing))
+
+        wanted: Set[int] = set(missing)
+        loaded: Dict[int, str] = {}
+        for message_id, sender, text, date in session.execute(query):
+            if message_id in wanted:
+                loaded[message_id] = app.json.dumps(
+                    {'id': message_id, 'sender': sender, 'message': text, 'date': date}
+                )
+        MESSAGE_FRAGMENTS.put_many(loaded)
+        fragments = [
+            fragment if fragment is not None else loaded.get(message_id)
+            for message_id, fragment in zip(ids, fragments)
+        ]
+
+    return RawJSON.array(fragment for fragment in fragments if fragment is not None)
+
+
+def messages_after(session: Session, after_id: int, limit: int) -> Dict[str, Any]:
+    """
+    Выбирает сообщения, отправленные после указанного идентификатора.
+
+    Args:
+        session: Сессия базы данных
+        after_id: Идентификатор последнего сообщения, известного клиенту
+        limit: Максимальное количество сообщений
+
+    Returns:
+        Dict[str, Any]: Сообщения, ID последнего из них и признак наличия следующих
+    """
+    new_messages: List[UserMessage] = session.scalars(
+        select(UserMessage)
+        .where(UserMessage.id > after_id)
+        .order_by(UserMessage.id)
+        .limit(limit)
+    ).all()
+
+    return {
+        'messages': [serialize_message(message) for message in new_messages],
+        'last_id': new_messages[-1].id if new_messages else after_id,
+        'has_more': len(new_messages) == limit
+    }
+
+
+def user_records(session: Session) -> List[Dict[str, Any]]:
+    """
+    Выбирает всех пользователей вместе с их профилями одним запросом.
+
+    Статусы берутся из PRESENCE, а не из базы данных.
+
+    Args:
+        session: Сессия базы данных
+
+    Returns:
+        List[Dict[str, Any]]: ID, имя, информация и статус каждого пользователя по возрастанию ID
+    """
+    rows = session.execute(
+        select(User.id, User.username, UserProfile.user_info)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .order_by(User.id)
+    ).all()
+
+    online: Set[int] = PRESENCE.online_ids()
+    return [
+        serialize_presence(row.id, row.username, row.user_info or '', row.id in online)
+        for row in rows
+    ]
+
+
+def legacy_users(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
     """
+    Преобразует записи пользователей в прежний формат параллельных массивов.
+
+    Args:
+        records: Записи пользователей из user_records()
+
+    Returns:
+        Dict[str, List[Any]]: Имена, описания, ID и статусы пользователей
+    """
+    return {
+        'names': [record['name'] for record in records],
+        'infos': [record['info'] for record in records],
+        'ids': [record['id'] for record in records],
+        'states': [record['state'] for record in records]
+    }
+
+
+def users_directory(session: Session, rows_format: bool) -> Any:
+    """
+    Выбирает данные всех пользователей в запрошенном формате.
+
+    Args:
+        session: Сессия базы данных
+        rows_format: Вернуть записи вместо параллельных массивов
+
+    Returns:
+        Any: Список записей пользователей или словарь параллельных массивов
+    """
+    records: List[Dict[str, Any]] = user_records(session)
+    return records if rows_format else legacy_users(records)
+
+
+@app.route('/messages', methods=['GET'])
+def messages() -> Tuple[flask.Response, int]:
+    """
+    Возвращает сообщения, отправленные после указанного идентификатора.
+
+    Query parameters:
+        after_id: Идентификатор последнего сообщения, известного клиенту (по умолчанию 0)
+        limit: Максимальное количество сообщений (не больше MESSAGES_PAGE_LIMIT)
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с новыми сообщениями и HTTP-статус
+
+    Example JSON response:
+        {
+            "messages": [{"id": 42, "sender": "john_doe", "message": "Привет", "date": "..."}],
+            "last_id": 42,
+            "has_more": false
+        }
+    """
+    after_id: int = flask.request.args.get('after_id', 0, type=int)
+    limit: int = flask.request.args.get('limit', MESSAGES_PAGE_LIMIT, type=int)
+    limit = max(1, min(limit, MESSAGES_PAGE_LIMIT))
+
+    if NOTIFIER.last_message_id <= after_id:
+        return flask.jsonify({'messages': [], 'last_id': after_id, 'has_more': False}), 200
+
     with MAIN_SESSION() as session:
-        users_name: List[str] = session.scalars(select(User.username)).all()
-        users_info: List[str] = session.scalars(select(UserProfile.user_info)).all()
-        users_id: List[int] = session.scalars(select(User.id)).all()
-        users_messages: List[str] = session.scalars(select(UserMessage.message)).all()
-        sender_users: List[str] = session.scalars(select(UserMessage.user_name)).all()
-        users_state: List[bool] = session.scalars(select(UserProfile.user_state)).all()
+        ids: List[int] = session.scalars(
+            select(UserMessage.id)
+            .where(UserMessage.id > after_id)
+            .order_by(UserMessage.id)
+            .limit(limit)
+        ).all()
+        return flask.jsonify({
+            'messages': message_array(session, ids),
+            'last_id': ids[-1] if ids else after_id,
+            'has_more': len(ids) == limit
+        }), 200
+
+
+@app.route('/history', methods=['GET'])
+def history() -> Tuple[flask.Response, int]:
+    """
+    Возвращает страницу истории сообщений, предшествующих указанному идентификатору.
+
+    Пагинация по ключу (keyset): страница выбирается по индексу первичного ключа,
+    поэтому стоимость запроса не зависит от длины истории.
+
+    Query parameters:
+        before_id: ID самого старого сообщения, известного клиенту (без него — последняя страница)
+        limit: Размер страницы (не больше MESSAGES_PAGE_LIMIT)
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ со страницей сообщений и HTTP-статус
+
+    Example JSON response:
+        {
+            "messages": [{"id": 101, "sender": "john_doe", "message": "Привет", "date": "..."}],
+            "first_id": 101,
+            "has_more": true
+        }
+    """
+    before_id: Optional[int] = flask.request.args.get('before_id', type=int)
+    limit: int = flask.request.args.get('limit', HISTORY_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MESSAGES_PAGE_LIMIT))
+
+    query: Select = select(UserMessage.id).order_by(UserMessage.id.desc()).limit(limit + 1)
+    if before_id is not None:
+        query = query.where(UserMessage.id < before_id)
+
+    with MAIN_SESSION() as session:
+        page: List[int] = session.scalars(query).all()
+
+        has_more: bool = len(page) > limit
+        page = list(reversed(page[:limit]))
 
         return flask.jsonify({
-            'names': users_name,
-            'infos': users_info,
-            'messages': users_messages,
-            'ids': users_id,
-            'sender_users': sender_users,
-            'states': users_state
+            'messages': message_array(session, page),
+            'first_id': page[0] if page else before_id,
+            'has_more': has_more
         }), 200
 
 
+def parse_date_bound(value: Optional[str], is_end: bool) -> Optional[str]:
+    """
+    Преобразует границу периода в формат, в котором хранится UserMessage.date.
+
+    Дата без времени в конце периода включает весь день.
+
+    Args:
+        value: Дата 'YYYY-MM-DD' или дата и время в формате ISO 8601
+        is_end: Является ли значение концом периода
+
+    Returns:
+        Optional[str]: Граница для сравнения строк дат или None, если она не задана
+
+    Raises:
+        ValueError: Если значение не является датой
+    """
+    if not value:
+        return None
+    if len(value) == 10:
+        day: datetime.date = datetime.date.fromisoformat(value)
+        return str(day + datetime.timedelta(days=1) if is_end else day)
+    return str(datetime.datetime.fromisoformat(value))
+
+
+@app.route('/messages/search', methods=['GET'])
+def messages_search() -> Tuple[flask.Response, int]:
+    """
+    Ищет сообщения через полнотекстовый индекс.
+
+    Query parameters:
+        q: Строка поиска (каждое слово ищется как префикс)
+        sender: Имя отправителя
+        date_from: Начало периода, 'YYYY-MM-DD' или ISO 8601
+        date_to: Конец периода (дата включается целиком), 'YYYY-MM-DD' или ISO 8601
+        limit: Размер страницы (не больше SEARCH_PAGE_LIMIT)
+        offset: Количество пропускаемых результатов
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с найденными сообщениями и HTTP-статус
+
+    Example JSON response:
+        {
+            "messages": [{"id": 7, "sender": "john_doe", "message": "...", "date": "...",
+                          "snippet": "…встретимся <b>завтра</b> утром…"}],
+            "next_offset": null
+        }
+    """
+    args = flask.request.args
+    limit: int = max(1, min(args.get('limit', SEARCH_PAGE_SIZE, type=int), SEARCH_PAGE_LIMIT))
+    offset: int = max(0, args.get('offset', 0, type=int))
+
+    try:
+        date_from: Optional[str] = parse_date_bound(args.get('date_from'), is_end=False)
+        date_to: Optional[str] = parse_date_bound(args.get('date_to'), is_end=True)
+    except ValueError:
+        return flask.jsonify({'answer': False, 'error': 'Некорректная дата'}), 400
+
+    with MAIN_SESSION() as session:
+        rows = search_messages(
+            session, args.get('q', ''), args.get('sender') or None, date_from, date_to, limit + 1, offset
+        )
+
+    return flask.jsonify({
+        'messages': [
+            {
+                'id': row.id,
+                'sender': row.user_name,
+                'message': row.message,
+                'date': row.date,
+                'snippet': highlight_snippet(row.snippet)
+            }
+            for row in rows[:limit]
+        ],
+        'next_offset': offset + limit if len(rows) > limit else None
+    }), 200
+
+
+@app.route('/users', methods=['GET'])
+def users() -> Tuple[flask.Response, int]:
+    """
+    Возвращает список пользователей без истории сообщений.
+
+    Поддерживает условные запросы по ETag, как и index().
+
+    Query parameters:
+        format: 'rows' — ответ {"users": [записи пользователей]}; иначе параллельные массивы
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с данными пользователей и HTTP-статус
+    """
+    rows_format: bool = wants_rows()
+
+    def build() -> Dict[str, Any]:
+        """Выбирает список пользователей из базы данных."""
+        with MAIN_SESSION() as session:
+            directory = users_directory(session, rows_format)
+        return {'users': directory} if rows_format else directory
+
+    etag: str = NOTIFIER.etag(users_only=True)
+    return conditional_json(f'{etag}-{ROWS_FORMAT}' if rows_format else etag, build)
+
+
+@app.route('/users/search', methods=['GET'])
+def users_search() -> Tuple[flask.Response, int]:
+    """
+    Ищет пользователей по имени и описанию через полнотекстовый индекс.
+
+    Query parameters:
+        q: Строка поиска (каждое слово ищется как префикс)
+        limit: Размер страницы (не больше SEARCH_PAGE_LIMIT)
+        offset: Количество пропускаемых результатов
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с найденными пользователями и HTTP-статус
+
+    Example JSON response:
+        {
+            "users": [{"id": 1, "name": "john_doe", "info": "...", "state": true}],
+            "next_offset": 20
+        }
+    """
+    query: str = flask.request.args.get('q', '')
+    limit: int = flask.request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, SEARCH_PAGE_LIMIT))
+    offset: int = max(0, flask.request.args.get('offset', 0, type=int))
+
+    with MAIN_SESSION() as session:
+        rows = search_users(session, query, limit + 1, offset)
+
+    online: Set[int] = PRESENCE.online_ids()
+    return flask.jsonify({
+        'users': [
+            serialize_presence(row.id, row.username, row.user_info or '', row.id in online)
+            for row in rows[:limit]
+        ],
+        'next_offset': offset + limit if len(rows) > limit else None
+    }), 200
+
+
+@app.route('/updates', methods=['GET'])
+def updates() -> Tuple[flask.Response, int]:
+    """
+    Ожидает новых сообщений или изменений списка пользователей (long polling).
+
+    Запрос удерживается, пока не появится сообщение с ID больше after_id,
+    не изменится версия списка пользователей или не истечет таймаут.
+    Пока изменений нет, запросы к базе данных не выполняются.
+
+    Query parameters:
+        after_id: Идентификатор последнего сообщения, известного клиенту
+        users_version: Версия списка пользователей, известная клиенту (-1, если неизвестна)
+        timeout: Время ожидания в секундах (не больше LONG_POLL_MAX_TIMEOUT)
+        format: 'rows' — список пользователей в виде записей, как в /users
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с изменениями и HTTP-статус
+
+    Example JSON response:
+        {
+            "messages": [{"id": 43, "sender": "john_doe", "message": "Привет", "date": "..."}],
+            "last_id": 43,
+            "has_more": false,
+            "users_version": 7,
+            "users": null
+        }
+    """
+    after_id: int = flask.request.args.get('after_id', 0, type=int)
+    users_version: int = flask.request.args.get('users_version', -1, type=int)
+    timeout: int = flask.request.args.get('timeout', LONG_POLL_TIMEOUT, type=int)
+    timeout = max(0, min(timeout, LONG_POLL_MAX_TIMEOUT))
+
+    NOTIFIER.wait_for_changes(after_id, users_version, timeout)
+
+    current_users_version: int = NOTIFIER.users_version
+    result: Dict[str, Any] = {
+        'messages': [],
+        'last_id': after_id,
+        'has_more': False,
+        'users_version': current_users_version,
+        'users': None
+    }
+
+    if NOTIFIER.last_message_id > after_id or current_users_version != users_version:
+        with MAIN_SESSION() as session:
+            if NOTIFIER.last_message_id > after_id:
+                result.update(messages_after(session, after_id, MESSAGES_PAGE_LIMIT))
+            if current_users_version != users_version:
+                result['users'] = users_directory(session, wants_rows())
+
+    return flask.jsonify(result), 200
+
+
+@app.route('/stream', methods=['GET'])
+def stream() -> flask.Response:
+    """
+    Поток Server-Sent Events с новыми сообщениями и изменениями статусов.
+
+    События 'message' содержат ID сообщения, поэтому после переподключения
+    клиент получает пропущенные сообщения по заголовку Last-Event-ID
+    (или параметру after_id).
+
+    Query parameters:
+        after_id: Идентификатор последнего сообщения, известного клиенту
+
+    Returns:
+        flask.Response: Потоковый ответ text/event-stream
+    """
+    after_id: Optional[int] = flask.request.args.get('after_id', type=int)
+    last_event_id: Optional[str] = flask.request.headers.get('Last-Event-ID')
+    if last_event_id and last_event_id.isdigit():
+        after_id = int(last_event_id)
+
+    def generate() -> Iterator[str]:
+        """
+        Отдает пропущенные сообщения, а затем события из подписки.
+
+        Сообщения отдаются строго по возрастанию ID. События публикуются
+        разными потоками и могут прийти не по порядку, поэтому при пропуске
+        ID недостающие сообщения перечитываются из базы данных, а события
+        с уже отправленными ID отбрасываются.
+        """
+        subscription: Subscription = BROKER.subscribe()
+        last_sent_id: int = NOTIFIER.last_message_id if after_id is None else after_id
+
+        def backlog() -> Iterator[str]:
+            """Отдает сообщения из базы данных после последнего отправленного."""
+            nonlocal last_sent_id
+            has_more: bool = True
+            while has_more:
+                with MAIN_SESSION() as session:
+                    page: Dict[str, Any] = messages_after(session, last_sent_id, MESSAGES_PAGE_LIMIT)
+                for message in page['messages']:
+                    yield format_event('message', message, message['id'])
+                last_sent_id = page['last_id']
+                has_more = page['has_more']
+
+        try:
+            yield f'retry: {STREAM_RETRY_MS}\n\n'
+            if after_id is not None:
+                yield from backlog()
+
+            while not subscription.closed:
+                try:
+                    event, data = subscription.events.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+
+                if event != 'message':
+                    yield format_event(event, data)
+                elif data['id'] == last_sent_id + 1:
+                    last_sent_id = data['id']
+                    yield format_event(event, data, data['id'])
+                elif data['id'] > last_sent_id:
+                    yield from backlog()
+        finally:
+            BROKER.unsubscribe(subscription)
+
+    return flask.Response(
+        flask.stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def bulk_items() -> Iterator[Item]:
+    """
+    Возвращает элементы импорта из тела запроса.
+
+    Тело с Content-Type application/x-ndjson читается построчно по мере
+    поступления, любое другое разбирается как JSON-массив.
+
+    Returns:
+        Iterator[Item]: Элементы импорта
+
+    Raises:
+        ValueError: Если тело запроса не является JSON-массивом
+    """
+    if flask.request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return ndjson_items(io.BufferedReader(flask.request.stream))
+    return array_items(flask.request.get_json(force=True, silent=True))
+
+
+def bulk_response(results: List[Dict[str, Any]]) -> Tuple[flask.Response, int]:
+    """
+    Формирует ответ на запрос импорта.
+
+    Args:
+        results: Результаты по каждому элементу импорта
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с количеством сохраненных и отклоненных элементов и HTTP-статус
+    """
+    failed: int = sum(1 for result in results if 'error' in result)
+    return flask.jsonify({
+        'inserted': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }), 200
+
+
+@app.route('/messages/bulk', methods=['POST'])
+def messages_bulk() -> Tuple[flask.Response, int]:
+    """
+    Импортирует сообщения пакетом.
+
+    Принимает JSON-массив или поток NDJSON (Content-Type application/x-ndjson).
+    Сообщения проверяются по отдельности и вставляются частями пакетными INSERT;
+    некорректные сообщения не мешают сохранению остальных.
+    Доступно только с токеном администратора (config.ADMIN_TOKEN) в заголовке
+    Authorization: Bearer, так как отправитель каждого сообщения задается в запросе.
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с результатом по каждому сообщению и HTTP-статус
+            (403 без токена администратора)
+
+    Example JSON request:
+        [
+            {"username": "john_doe", "text": "Привет", "date": "2024-01-31T12:00:00"},
+            {"username": "jane", "text": "Дата необязательна"}
+        ]
+
+    Example JSON response:
+        {
+            "inserted": 1,
+            "failed": 1,
+            "results": [{"id": 42}, {"error": "Пользователь 'jane' не найден"}]
+        }
+    """
+    if not admin_authorized():
+        return forbidden()
+
+    try:
+        items: Iterator[Item] = bulk_items()
+    except ValueError as error:
+        return flask.jsonify({'answer': False, 'error': str(error)}), 400
+
+    return bulk_response(ingest_messages(MAIN_SESSION, items, publish_records))
+
+
+@app.route('/users/bulk', methods=['POST'])
+def users_bulk() -> Tuple[flask.Response, int]:
+    """
+    Регистрирует пользователей пакетом.
+
+    Принимает JSON-массив или поток NDJSON (Content-Type application/x-ndjson).
+    Пользователи с занятыми именами отклоняются, остальные сохраняются
+    частями пакетными INSERT со статусом «не в сети».
+    Доступно только с токеном администратора (config.ADMIN_TOKEN) в заголовке
+    Authorization: Bearer.
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ с результатом по каждому пользователю и HTTP-статус
+            (403 без токена администратора)
+
+    Example JSON request:
+        [{"username": "john_doe", "user_info": "Информация", "password": "secret"}]
+
+    Example JSON response:
+        {"inserted": 1, "failed": 0, "results": [{"id": 7}]}
+    """
+    if not admin_authorized():
+        return forbidden()
+
+    try:
+        items: Iterator[Item] = bulk_items()
+    except ValueError as error:
+        return flask.jsonify({'answer': False, 'error': str(error)}), 400
+
+    return bulk_response(ingest_users(MAIN_SESSION, items, publish_users))
+
+
 @app.route('/send_message', methods=['POST'])
 def send_message() -> Tuple[flask.Response, int]:
     """
     Отправляет новое сообщение от имени пользователя.
 
+    Отправитель определяется по токену сессии в заголовке Authorization: Bearer.
+    В режиме config.WRITE_BEHIND сообщение сохраняется фоновым потоком
+    вместе с другими одновременно отправленными; ответ с ID сообщения
+    возвращается после фиксации транзакции.
+
     Returns:
         Tuple[flask.Response, int]: JSON-ответ с результатом операции и HTTP-статус
+            (401 без действующего токена)
 
     Example JSON request:
         {
-            "text": "Текст сообщения",
-            "username": "john_doe"
+            "text": "Текст сообщения"
         }
     """
+    info: Optional[SessionInfo] = SESSIONS.resolve(bearer_token())
+    if info is None:
+        return unauthorized()
+
     data: Dict[str, Any] = flask.request.json
     new_message: UserMessage = UserMessage(
         date=str(datetime.datetime.now()),
         message=data.get('text', ''),
-        user_name=data.get('username', '')
+        user_name=info.username
     )
 
+    if config.WRITE_BEHIND:
+        message_id: int = MESSAGE_WRITER.submit(new_message).result()
+        return flask.jsonify({'answer': True, 'id': message_id}), 200
+
     with MAIN_SESSION() as session:
         session.add(new_message)
         session.commit()
-        return flask.jsonify({'answer': True}), 200
+        publish_messages([new_message])
+        return flask.jsonify({'answer': True, 'id': new_message.id}), 200
+
+
+@app.route('/heartbeat', methods=['POST'])
+def heartbeat() -> Tuple[flask.Response, int]:
+    """
+    Продлевает статус «в сети» пользователя.
+
+    Клиент должен присылать heartbeat чаще, чем раз в config.PRESENCE_TTL секунд,
+    иначе пользователь будет переведен в статус «не в сети». Пользователь
+    определяется по токену сессии, heartbeat не обращается к базе данных.
+
+    Returns:
+        Tuple[flask.Response, int]: JSON-ответ со сроком действия статуса и HTTP-статус
+            (401 без действующего токена)
+
+    Example JSON response:
+        {"answer": true, "ttl": 30}
+    """
+    info: Optional[SessionInfo] = SESSIONS.resolve(bearer_token())
+    if info is None:
+        return unauthorized()
+
+    if PRESENCE.touch(info.user_id):
+        NOTIFIER.users_changed()
+        BROKER.publish('presence', serialize_presence(info.user_id, info.username, info.user_info, True))
+
+    return flask.jsonify({'answer': True, 'ttl': PRESENCE.ttl}), 200
 
 
 @app.route('/change_state', methods=['POST'])
 def change_state() -> Tuple[flask.Response, int]:
     """
-    Изменяет состояние пользователя на неактивное.
+    Изменяет состояние пользователя на неактивное и завершает его сессию.
 
-    Returns:
-        Tuple[flask.Response, int]: Пустой ответ и HTTP-статус
+    Пользователь определяется по токену сессии в заголовке Authorization: Bearer.
 
-    Example JSON request:
-        {
-            "id": 1
-        }
+    Returns:
+        Tuple[flask.Response, int]: Пустой ответ и HTTP-статус (401 без действующего токена)
     """
-    user_id: int = flask.request.json['id']
+    token: Optional[str] = bearer_token()
+    info: Optional[SessionInfo] = SESSIONS.resolve(token)
+    if info is None:
+        return unauthorized()
 
-    with MAIN_SESSION() as session:
-        profile: Optional[UserProfile] = session.scalar(
-            select(UserProfile).where(UserProfile.id == user_id)
-        )
-        if profile:
-            profile.user_state = False
-            session.commit()
+    if PRESENCE.set_offline(info.user_id):
+        NOTIFIER.users_changed()
+        BROKER.publish('presence', serialize_presence(info.user_id, info.username, info.user_info, False))
+    SESSIONS.revoke(token)
 
     return flask.Response('', status=200), 200
 
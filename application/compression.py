@@ -0,0 +1,141 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+ENCODINGS: Tuple[str, ...] = ('gzip', 'deflate')
+"""Поддерживаемые способы сжатия в порядке предпочтения."""
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Выбирает способ сжатия по заголовку Accept-Encoding.
+
+    Args:
+        accept_encoding: Значение заголовка, например 'gzip, deflate;q=0.5'
+
+    Returns:
+        Optional[str]: 'gzip', 'deflate' или None, если клиент не принимает ни один из них
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        weight: float = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+
+    wildcard: float = weights.get('*', 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -position, encoding)
+        for position, encoding in enumerate(ENCODINGS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Возвращает ETag сжатого представления ответа.
+
+    Сильный ETag должен различаться для разных способов сжатия одного
+    ресурса, иначе кэши могут отдать сжатое тело вместо несжатого.
+
+    Args:
+        etag: ETag несжатого ответа (без кавычек)
+        encoding: 'gzip' или 'deflate'
+
+    Returns:
+        str: ETag сжатого ответа (без кавычек)
+    """
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag: str) -> Tuple[str, ...]:
+    """
+    Возвращает ETag несжатого и всех сжатых представлений ответа.
+
+    Args:
+        etag: ETag несжатого ответа (без кавычек)
+
+    Returns:
+        Tuple[str, ...]: ETag без сжатия и для каждого способа из ENCODINGS
+    """
+    return (etag,) + tuple(encoded_etag(etag, encoding) for encoding in ENCODINGS)
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """
+    Сжимает тело ответа.
+
+    Args:
+        body: Тело ответа
+        encoding: 'gzip' или 'deflate' (формат zlib, как требует HTTP)
+        level: Уровень сжатия от 1 до 9
+
+    Returns:
+        bytes: Сжатое тело
+    """
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+class CompressionCache:
+    """
+    Кэш сжатых тел ответов с ETag.
+
+    Ответ с тем же ETag одинаков для всех клиентов, поэтому он сжимается
+    один раз для каждого способа сжатия, а остальные клиенты получают
+    готовое сжатое тело. Давно не использованные записи вытесняются.
+
+    Attributes:
+        max_entries: Максимальное количество сжатых тел в кэше
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """
+        Инициализирует кэш.
+
+        Args:
+            max_entries: Максимальное количество сжатых тел в кэше
+        """
+        self.max_entries = max(1, max_entries)
+        self._lock: threading.Lock = threading.Lock()
+        self._entries: OrderedDict[Tuple[str, str, str], bytes] = OrderedDict()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        """
+        Возвращает сжатое тело из кэша.
+
+        Args:
+            key: Адрес запроса, ETag и способ сжатия
+
+        Returns:
+            Optional[bytes]: Сжатое тело или None, если его нет в кэше
+        """
+        with self._lock:
+            body: Optional[bytes] = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str, str], body: bytes) -> None:
+        """
+        Сохраняет сжатое тело в кэше.
+
+        Args:
+            key: Адрес запроса, ETag и способ сжатия
+            body: Сжатое тело
+        """
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
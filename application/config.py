@@ -0,0 +1,80 @@
+import os
+
+
+DATABASE_URL: str = os.environ.get('TSV_DATABASE_URL', 'sqlite:///tsv_user.db')
+"""Адрес базы данных (переменная окружения TSV_DATABASE_URL)."""
+
+SQLITE_JOURNAL_MODE: str = os.environ.get('TSV_SQLITE_JOURNAL_MODE', 'WAL')
+"""
+Режим журнала SQLite. В режиме WAL читатели не блокируются записью
+и запись не ждет окончания чтения.
+"""
+
+SQLITE_SYNCHRONOUS: str = os.environ.get('TSV_SQLITE_SYNCHRONOUS', 'NORMAL')
+"""
+Уровень синхронизации с диском. NORMAL в режиме WAL не рискует целостностью базы,
+но не вызывает fsync при каждой фиксации транзакции.
+"""
+
+SQLITE_BUSY_TIMEOUT: int = int(os.environ.get('TSV_SQLITE_BUSY_TIMEOUT', 5000))
+"""Время ожидания освобождения блокировки записи, в миллисекундах."""
+
+SQLITE_MMAP_SIZE: int = int(os.environ.get('TSV_SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+"""Размер файла базы, отображаемого в память, в байтах (0 отключает mmap)."""
+
+SQLITE_CACHE_SIZE: int = int(os.environ.get('TSV_SQLITE_CACHE_SIZE', -64 * 1024))
+"""Размер страничного кэша каждого соединения: в страницах, либо в КиБ, если значение отрицательное."""
+
+POOL_SIZE: int = int(os.environ.get('TSV_POOL_SIZE', 8))
+"""Количество постоянно открытых соединений с базой данных."""
+
+POOL_MAX_OVERFLOW: int = int(os.environ.get('TSV_POOL_MAX_OVERFLOW', 8))
+"""Количество дополнительных соединений сверх POOL_SIZE при пиковой нагрузке."""
+
+POOL_TIMEOUT: int = int(os.environ.get('TSV_POOL_TIMEOUT', 30))
+"""Время ожидания свободного соединения из пула, в секундах."""
+
+WRITE_BEHIND: bool = os.environ.get('TSV_WRITE_BEHIND', '1') != '0'
+"""
+Записывать сообщения группами через фоновый поток (group commit).
+Значение '0' возвращает запись каждого сообщения отдельной транзакцией в запросе.
+"""
+
+WRITE_BATCH_SIZE: int = int(os.environ.get('TSV_WRITE_BATCH_SIZE', 100))
+"""Максимальное количество сообщений, сохраняемых одной транзакцией."""
+
+WRITE_BATCH_DELAY_MS: int = int(os.environ.get('TSV_WRITE_BATCH_DELAY_MS', 5))
+"""Максимальное время набора группы сообщений после первого из них, в миллисекундах."""
+
+PRESENCE_TTL: int = int(os.environ.get('TSV_PRESENCE_TTL', 30))
+"""
+Время, в течение которого пользователь считается в сети после последнего
+heartbeat, в секундах. Должно быть в несколько раз больше интервала heartbeat клиента.
+"""
+
+SESSION_LIFETIME_DAYS: int = int(os.environ.get('TSV_SESSION_LIFETIME_DAYS', 30))
+"""Срок действия токена сессии с момента входа, в днях."""
+
+SESSION_CACHE_SIZE: int = int(os.environ.get('TSV_SESSION_CACHE_SIZE', 10000))
+"""Максимальное количество сессий в кэше сервера."""
+
+SESSION_CACHE_TTL: int = int(os.environ.get('TSV_SESSION_CACHE_TTL', 600))
+"""Время, через которое сессия из кэша снова проверяется по базе данных, в секундах."""
+
+COMPRESSION_MIN_SIZE: int = int(os.environ.get('TSV_COMPRESSION_MIN_SIZE', 1024))
+"""Минимальный размер тела ответа, начиная с которого оно сжимается, в байтах."""
+
+COMPRESSION_LEVEL: int = int(os.environ.get('TSV_COMPRESSION_LEVEL', 6))
+"""Уровень сжатия gzip/deflate от 1 (быстрее) до 9 (меньше)."""
+
+COMPRESSION_CACHE_SIZE: int = int(os.environ.get('TSV_COMPRESSION_CACHE_SIZE', 64))
+"""Количество сжатых тел ответов с ETag, хранимых в кэше."""
+
+MESSAGE_FRAGMENT_CACHE_SIZE: int = int(os.environ.get('TSV_MESSAGE_FRAGMENT_CACHE_SIZE', 100000))
+"""Количество сообщений, хранимых в кэше уже сериализованными в JSON."""
+
+ADMIN_TOKEN: str = os.environ.get('TSV_ADMIN_TOKEN', '')
+"""
+Токен администратора для пакетного импорта (/messages/bulk, /users/bulk)
+в заголовке Authorization: Bearer. Пустое значение отключает импорт.
+"""
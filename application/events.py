@@ -0,0 +1,162 @@
+import queue
+import threading
+import uuid
+from typing import Any, Dict, List, Tuple
+
+
+class ChangeNotifier:
+    """
+    Отслеживает изменения данных чата и будит ожидающие их запросы.
+
+    Attributes:
+        epoch: Случайный идентификатор запуска сервера (версии сбрасываются при перезапуске)
+        version: Версия всех данных чата (растет при любом изменении)
+        last_message_id: ID последнего сохраненного сообщения
+        users_version: Версия списка пользователей (растет при регистрации и смене статуса)
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует счетчики изменений."""
+        self._condition: threading.Condition = threading.Condition()
+        self.epoch: str = uuid.uuid4().hex[:8]
+        self.version: int = 0
+        self.last_message_id: int = 0
+        self.users_version: int = 0
+
+    def etag(self, users_only: bool = False) -> str:
+        """
+        Возвращает ETag текущего состояния данных.
+
+        Args:
+            users_only: Учитывать только изменения списка пользователей
+
+        Returns:
+            str: Значение ETag без кавычек
+        """
+        if users_only:
+            return f'{self.epoch}-u{self.users_version}'
+        return f'{self.epoch}-{self.version}'
+
+    def message_added(self, message_id: int) -> None:
+        """
+        Фиксирует появление нового сообщения.
+
+        Args:
+            message_id: ID сохраненного сообщения
+        """
+        with self._condition:
+            if message_id > self.last_message_id:
+                self.last_message_id = message_id
+                self.version += 1
+                self._condition.notify_all()
+
+    def users_changed(self) -> None:
+        """Фиксирует изменение списка пользователей или их статусов."""
+        with self._condition:
+            self.users_version += 1
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait_for_changes(self, after_id: int, users_version: int, timeout: float) -> bool:
+        """
+        Ожидает изменений относительно состояния, известного клиенту.
+
+        Args:
+            after_id: ID последнего сообщения, известного клиенту
+            users_version: Версия списка пользователей, известная клиенту
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            bool: True, если изменения появились, False по истечении таймаута
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.last_message_id > after_id or self.users_version != users_version,
+                timeout
+            )
+
+
+class Subscription:
+    """
+    Подписка одного клиента на поток событий.
+
+    Attributes:
+        events: Очередь событий, ожидающих отправки клиенту
+        closed: Признак того, что подписка отключена брокером из-за переполнения очереди
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Инициализирует подписку.
+
+        Args:
+            max_size: Максимальное количество неотправленных событий
+        """
+        self.events: queue.Queue[Tuple[str, Dict[str, Any]]] = queue.Queue(maxsize=max_size)
+        self.closed: bool = False
+
+
+class EventBroker:
+    """
+    Рассылает события всем подписанным клиентам внутри процесса.
+
+    Отстающий клиент, у которого переполнилась очередь, отключается:
+    он переподключится и догонит пропущенные сообщения по Last-Event-ID.
+    """
+
+    def __init__(self, max_queue_size: int = 1000) -> None:
+        """
+        Инициализирует брокер.
+
+        Args:
+            max_queue_size: Размер очереди событий каждой подписки
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._subscriptions: List[Subscription] = []
+        self._max_queue_size: int = max_queue_size
+
+    def subscribe(self) -> Subscription:
+        """
+        Создает новую подписку на события.
+
+        Returns:
+            Subscription: Подписка с собственной очередью событий
+        """
+        subscription = Subscription(self._max_queue_size)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Удаляет подписку.
+
+        Args:
+            subscription: Подписка, полученная из subscribe()
+        """
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """
+        Отправляет событие всем подписчикам.
+
+        Args:
+            event: Тип события ('message' или 'presence')
+            data: Данные события
+        """
+        with self._lock:
+            for subscription in list(self._subscriptions):
+                try:
+                    subscription.events.put_nowait((event, data))
+                except queue.Full:
+                    subscription.closed = True
+                    self._subscriptions.remove(subscription)
+
+
+NOTIFIER: ChangeNotifier = ChangeNotifier()
+"""Общий для всех запросов экземпляр уведомителя об изменениях."""
+
+BROKER: EventBroker = EventBroker()
+"""Общий для всех запросов брокер событий для потоков /stream."""
@@ -0,0 +1,319 @@
+import datetime
+import itertools
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from application.models import User, UserMessage, UserProfile
+from application.search import bulk_message_indexing
+
+
+BULK_CHUNK_SIZE: int = 5000
+"""Количество записей, вставляемых одним пакетным запросом и одной транзакцией."""
+
+Item = Tuple[Any, Optional[str]]
+"""Элемент импорта: разобранный объект и ошибка разбора (None, если ее нет)."""
+
+
+def array_items(data: Any) -> Iterator[Item]:
+    """
+    Возвращает элементы импорта из JSON-массива.
+
+    Args:
+        data: Разобранное тело запроса
+
+    Returns:
+        Iterator[Item]: Элементы массива без ошибок разбора
+
+    Raises:
+        ValueError: Если тело запроса не является массивом
+    """
+    if not isinstance(data, list):
+        raise ValueError('Ожидается JSON-массив или NDJSON')
+    return ((item, None) for item in data)
+
+
+def ndjson_items(lines: Iterable[bytes]) -> Iterator[Item]:
+    """
+    Построчно разбирает поток NDJSON, не загружая его в память целиком.
+
+    Пустые строки пропускаются; строка с некорректным JSON становится
+    элементом с ошибкой и не прерывает импорт.
+
+    Args:
+        lines: Строки тела запроса
+
+    Returns:
+        Iterator[Item]: Разобранные объекты и ошибки разбора
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as error:
+            yield None, f'Некорректный JSON: {error}'
+
+
+def chunks(items: Iterator[Item], size: int = BULK_CHUNK_SIZE) -> Iterator[List[Item]]:
+    """
+    Делит элементы импорта на части.
+
+    Args:
+        items: Элементы импорта
+        size: Размер части
+
+    Returns:
+        Iterator[List[Item]]: Части не длиннее size
+    """
+    while True:
+        chunk: List[Item] = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def string_field(item: Dict[str, Any], name: str, required: bool) -> str:
+    """
+    Возвращает строковое поле элемента импорта.
+
+    Args:
+        item: Элемент импорта
+        name: Имя поля
+        required: Должно ли поле быть непустым
+
+    Returns:
+        str: Значение поля ('' для отсутствующего необязательного поля)
+
+    Raises:
+        ValueError: Если поле не строка или обязательное поле пустое
+    """
+    value: Any = item.get(name, '')
+    if not isinstance(value, str):
+        raise ValueError(f"Поле '{name}' должно быть строкой")
+    if required and not value:
+        raise ValueError(f"Поле '{name}' обязательно")
+    return value
+
+
+def validate_message(item: Any) -> Dict[str, str]:
+    """
+    Проверяет сообщение из импорта и приводит его к строке таблицы.
+
+    Args:
+        item: Объект {"username": ..., "text": ..., "date": ...}; дата необязательна
+
+    Returns:
+        Dict[str, str]: Значения столбцов user_messages
+
+    Raises:
+        ValueError: Если сообщение некорректно
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Ожидается JSON-объект')
+
+    date: str = string_field(item, 'date', required=False)
+    try:
+        date = str(datetime.datetime.fromisoformat(date) if date else datetime.datetime.now())
+    except ValueError:
+        raise ValueError(f"Некорректная дата '{date}'")
+
+    return {
+        'user_name': string_field(item, 'username', required=True),
+        'message': string_field(item, 'text', required=False),
+        'date': date
+    }
+
+
+def validate_user(item: Any) -> Dict[str, str]:
+    """
+    Проверяет пользователя из импорта.
+
+    Args:
+        item: Объект {"username": ..., "user_info": ..., "password": ...}
+
+    Returns:
+        Dict[str, str]: Имя, информация и пароль пользователя
+
+    Raises:
+        ValueError: Если пользователь некорректен
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Ожидается JSON-объект')
+
+    return {
+        'username': string_field(item, 'username', required=True),
+        'user_info': string_field(item, 'user_info', required=False),
+        'password': string_field(item, 'password', required=False)
+    }
+
+
+def begin_write(session: Session) -> None:
+    """
+    Начинает транзакцию сессии сразу с блокировкой записи (BEGIN IMMEDIATE).
+
+    Пока блокировка удерживается, другие соединения не вставляют строки,
+    поэтому ID строк, вставленных пакетом, идут подряд после текущего максимума.
+
+    Args:
+        session: Сессия базы данных без начатой транзакции
+    """
+    session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def existing_usernames(session: Session, usernames: Set[str]) -> Set[str]:
+    """
+    Выбирает из переданных имен те, что уже есть в базе данных.
+
+    Args:
+        session: Сессия базы данных
+        usernames: Проверяемые имена
+
+    Returns:
+        Set[str]: Имена зарегистрированных пользователей
+    """
+    if not usernames:
+        return set()
+    return set(session.scalars(select(User.username).where(User.username.in_(usernames))))
+
+
+def ingest_messages(session_factory: Callable[[], Session], items: Iterator[Item],
+                    on_commit: Callable[[List[Dict[str, Any]]], None]) -> List[Dict[str, Any]]:
+    """
+    Импортирует сообщения частями по BULK_CHUNK_SIZE.
+
+    Каждая часть проверяется, вставляется одним пакетным INSERT (executemany)
+    и фиксируется отдельной транзакцией; полнотекстовый индекс пополняется
+    один раз на часть. Сообщения от незарегистрированных пользователей отклоняются.
+
+    Args:
+        session_factory: Фабрика сессий базы данных
+        items: Элементы импорта
+        on_commit: Вызывается с сохраненными сообщениями каждой части
+            в формате {'id', 'sender', 'message', 'date'}
+
+    Returns:
+        List[Dict[str, Any]]: Результат по каждому элементу: {'id': ...} или {'error': ...}
+    """
+    results: List[Dict[str, Any]] = []
+    known_senders: Set[str] = set()
+
+    for chunk in chunks(items):
+        rows: List[Dict[str, str]] = []
+        positions: List[int] = []
+        chunk_results: List[Dict[str, Any]] = []
+
+        for item, error in chunk:
+            if error is None:
+                try:
+                    rows.append(validate_message(item))
+                    positions.append(len(chunk_results))
+                except ValueError as validation_error:
+                    error = str(validation_error)
+            chunk_results.append({'error': error} if error is not None else {})
+
+        with session_factory() as session:
+            known_senders |= existing_usernames(session, {row['user_name'] for row in rows} - known_senders)
+            accepted: List[Tuple[int, Dict[str, str]]] = []
+            for position, row in zip(positions, rows):
+                if row['user_name'] in known_senders:
+                    accepted.append((position, row))
+                else:
+                    chunk_results[position] = {'error': f"Пользователь '{row['user_name']}' не найден"}
+
+            if accepted:
+                session.commit()
+                begin_write(session)
+                with bulk_message_indexing(session.connection()) as last_id:
+                    session.execute(insert(UserMessage.__table__), [row for _, row in accepted])
+                session.commit()
+                ids: range = range(last_id + 1, last_id + 1 + len(accepted))
+
+                for (position, _), message_id in zip(accepted, ids):
+                    chunk_results[position] = {'id': message_id}
+                on_commit([
+                    {'id': message_id, 'sender': row['user_name'], 'message': row['message'], 'date': row['date']}
+                    for (_, row), message_id in zip(accepted, ids)
+                ])
+
+        results.extend(chunk_results)
+
+    return results
+
+
+def ingest_users(session_factory: Callable[[], Session], items: Iterator[Item],
+                 on_commit: Callable[[List[Dict[str, Any]]], None]) -> List[Dict[str, Any]]:
+    """
+    Импортирует пользователей с профилями частями по BULK_CHUNK_SIZE.
+
+    Имена, уже занятые в базе данных или повторяющиеся в импорте, отклоняются;
+    имена каждой части проверяются и вставляются под одной блокировкой записи.
+    Импортированные пользователи получают статус «не в сети».
+
+    Args:
+        session_factory: Фабрика сессий базы данных
+        items: Элементы импорта
+        on_commit: Вызывается с сохраненными пользователями каждой части
+            в формате {'id', 'name', 'info', 'state'}
+
+    Returns:
+        List[Dict[str, Any]]: Результат по каждому элементу: {'id': ...} или {'error': ...}
+    """
+    results: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+
+    for chunk in chunks(items):
+        users: List[Dict[str, str]] = []
+        positions: List[int] = []
+        chunk_results: List[Dict[str, Any]] = []
+
+        for item, error in chunk:
+            if error is None:
+                try:
+                    users.append(validate_user(item))
+                    positions.append(len(chunk_results))
+                except ValueError as validation_error:
+                    error = str(validation_error)
+            chunk_results.append({'error': error} if error is not None else {})
+
+        with session_factory() as session:
+            # Блокировка записи до проверки имен: иначе /register или другой импорт
+            # может занять имя между проверкой и вставкой
+            begin_write(session)
+            taken: Set[str] = existing_usernames(session, {user['username'] for user in users})
+            accepted: List[Tuple[int, Dict[str, str]]] = []
+            for position, user in zip(positions, users):
+                if user['username'] in taken or user['username'] in seen:
+                    chunk_results[position] = {'error': f"Имя '{user['username']}' уже занято"}
+                else:
+                    seen.add(user['username'])
+                    accepted.append((position, user))
+
+            if accepted:
+                ids: List[int] = session.scalars(
+                    insert(User).returning(User.id, sort_by_parameter_order=True),
+                    [{'username': user['username']} for _, user in accepted]
+                ).all()
+                session.execute(insert(UserProfile), [
+                    {
+                        'user_id': user_id,
+                        'user_info': user['user_info'],
+                        'user_password': user['password'],
+                        'user_state': False
+                    }
+                    for (_, user), user_id in zip(accepted, ids)
+                ])
+                session.commit()
+
+                for (position, _), user_id in zip(accepted, ids):
+                    chunk_results[position] = {'id': user_id}
+                on_commit([
+                    {'id': user_id, 'name': user['username'], 'info': user['user_info'], 'state': False}
+                    for (_, user), user_id in zip(accepted, ids)
+                ])
+
+        results.extend(chunk_results)
+
+    return results
@@ -0,0 +1,105 @@
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Connection, Engine
+
+from application.models import Base
+from application.search import create_search_index
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+"""Журнал выполнения миграций."""
+
+
+def create_tables(connection: Connection) -> None:
+    """
+    Создает отсутствующие таблицы моделей.
+
+    Args:
+        connection: Соединение с базой данных в открытой транзакции
+    """
+    Base.metadata.create_all(bind=connection)
+
+
+def add_lookup_indexes(connection: Connection) -> None:
+    """
+    Добавляет индексы на часто используемые для поиска столбцы.
+
+    Имена пользователей становятся уникальными: это требуется и для входа,
+    и для внешнего ключа user_messages.user_name. Если в старой базе уже есть
+    повторяющиеся имена, у всех повторов, кроме самого раннего, к имени
+    добавляется суффикс с ID пользователя.
+
+    Args:
+        connection: Соединение с базой данных в открытой транзакции
+    """
+    duplicates = connection.exec_driver_sql("""
+        SELECT id, username FROM users
+        WHERE id NOT IN (SELECT min(id) FROM users GROUP BY username)
+    """).all()
+    for user_id, username in duplicates:
+        new_name: str = f'{username}_{user_id}'
+        logger.warning('Повторяющееся имя пользователя %r (ID %s) изменено на %r', username, user_id, new_name)
+        connection.exec_driver_sql('UPDATE users SET username = ? WHERE id = ?', (new_name, user_id))
+
+    connection.exec_driver_sql('CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)')
+    connection.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_user_messages_user_name_id ON user_messages (user_name, id)'
+    )
+    connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_user_messages_date ON user_messages (date)')
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, 'Создание таблиц', create_tables),
+    (2, 'Полнотекстовые индексы пользователей и сообщений', create_search_index),
+    (3, 'Индексы для входа и выборки сообщений по отправителю и дате', add_lookup_indexes),
+    (4, 'Таблица сессий пользователей', create_tables),
+]
+"""
+Миграции схемы базы данных по возрастанию версии.
+
+Каждая миграция должна быть идемпотентной: новая база создается миграцией 1
+уже по актуальным моделям, после чего выполняются и все остальные.
+"""
+
+
+def schema_version(connection: Connection) -> int:
+    """
+    Возвращает версию схемы базы данных.
+
+    Args:
+        connection: Соединение с базой данных
+
+    Returns:
+        int: Номер последней примененной миграции (0 для новой или старой базы)
+    """
+    return connection.exec_driver_sql('PRAGMA user_version').scalar() or 0
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Применяет к базе данных все миграции, которые еще не были применены.
+
+    Версия схемы хранится в PRAGMA user_version. Каждая миграция выполняется
+    в отдельной транзакции вместе с записью новой версии.
+
+    Args:
+        engine: Движок базы данных SQLite
+
+    Returns:
+        int: Версия схемы после миграции
+    """
+    with engine.connect() as connection:
+        current: int = schema_version(connection)
+
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+
+        with engine.begin() as connection:
+            logger.info('Миграция %s: %s', version, description)
+            apply(connection)
+            connection.exec_driver_sql(f'PRAGMA user_version = {version}')
+        current = version
+
+    return current
@@ -1,9 +1,78 @@
-from sqlalchemy import create_engine, ForeignKey, Engine
+from sqlalchemy import create_engine, event, make_url, ForeignKey, Engine, Index
 from sqlalchemy.orm import sessionmaker, Mapped, mapped_column, relationship, DeclarativeBase
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+from application import config
 
-ENGINE: Engine = create_engine('sqlite:///tsv_user.db')
+
+JOURNAL_MODES: List[str] = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF']
+"""Допустимые значения PRAGMA journal_mode."""
+
+SYNCHRONOUS_MODES: List[str] = ['OFF', 'NORMAL', 'FULL', 'EXTRA']
+"""Допустимые значения PRAGMA synchronous."""
+
+
+def create_database_engine(url: str = config.DATABASE_URL) -> Engine:
+    """
+    Создает движок базы данных с настройками из application.config.
+
+    Для файловой базы SQLite каждому новому соединению задаются режим журнала,
+    уровень синхронизации, время ожидания блокировки, размер mmap и кэша,
+    а соединения берутся из пула заданного размера.
+
+    Args:
+        url: Адрес базы данных
+
+    Returns:
+        Engine: Движок базы данных
+
+    Raises:
+        ValueError: Если режим журнала или синхронизации указан неверно
+    """
+    journal_mode: str = config.SQLITE_JOURNAL_MODE.upper()
+    synchronous: str = config.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f'Неизвестный режим журнала SQLite: {config.SQLITE_JOURNAL_MODE}')
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f'Неизвестный режим синхронизации SQLite: {config.SQLITE_SYNCHRONOUS}')
+
+    database_url = make_url(url)
+    is_sqlite: bool = database_url.get_backend_name() == 'sqlite'
+    in_memory: bool = is_sqlite and database_url.database in (None, '', ':memory:')
+
+    options: Dict[str, Any] = {}
+    if not in_memory:
+        options.update(
+            pool_size=config.POOL_SIZE,
+            max_overflow=config.POOL_MAX_OVERFLOW,
+            pool_timeout=config.POOL_TIMEOUT
+        )
+    if is_sqlite:
+        options['connect_args'] = {
+            'timeout': config.SQLITE_BUSY_TIMEOUT / 1000,
+            'check_same_thread': False
+        }
+
+    engine: Engine = create_engine(database_url, **options)
+    if not is_sqlite:
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        """Применяет настройки SQLite к новому соединению."""
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+        cursor.execute(f'PRAGMA synchronous = {synchronous}')
+        cursor.execute(f'PRAGMA busy_timeout = {int(config.SQLITE_BUSY_TIMEOUT)}')
+        cursor.execute(f'PRAGMA mmap_size = {int(config.SQLITE_MMAP_SIZE)}')
+        cursor.execute(f'PRAGMA cache_size = {int(config.SQLITE_CACHE_SIZE)}')
+        cursor.close()
+
+    return engine
+
+
+ENGINE: Engine = create_database_engine()
 """Движок базы данных SQLite."""
 
 MAIN_SESSION = sessionmaker(bind=ENGINE)
@@ -21,14 +90,14 @@ class User(Base):
 
     Attributes:
         id (Mapped[int]): Уникальный идентификатор пользователя
-        username (Mapped[str]): Имя пользователя
+        username (Mapped[str]): Имя пользователя (уникальное, индексируется)
         user_profile (Mapped[UserProfile]): Профиль пользователя (один-к-одному)
         messages (Mapped[List[UserMessage]]): Сообщения пользователя (один-ко-многим)
     """
     __tablename__: str = 'users'
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    username: Mapped[str] = mapped_column()
+    username: Mapped[str] = mapped_column(index=True, unique=True)
 
     user_profile: Mapped[Optional['UserProfile']] = relationship(
         back_populates='user',
@@ -50,7 +119,8 @@ class UserProfile(Base):
         user_info (Mapped[str]): Дополнительная информация о пользователе
         user_password (Mapped[str]): Пароль пользователя
         user_id (Mapped[int]): Внешний ключ к пользователю
-        user_state (Mapped[bool]): Состояние пользователя (активен/неактивен)
+        user_state (Mapped[bool]): Состояние пользователя при регистрации (текущий статус
+            хранится в памяти сервера, см. application.presence)
         user (Mapped[User]): Связанный пользователь
     """
     __tablename__: str = 'user_profiles'
@@ -70,16 +140,35 @@ class UserMessage(Base):
 
     Attributes:
         id (Mapped[int]): Уникальный идентификатор сообщения
-        date (Mapped[str]): Дата и время отправки сообщения
+        date (Mapped[str]): Дата и время отправки сообщения (индексируется)
         message (Mapped[str]): Текст сообщения
         user_name (Mapped[str]): Имя пользователя-отправителя (внешний ключ)
         user (Mapped[User]): Связанный пользователь-отправитель
     """
     __tablename__: str = 'user_messages'
+    __table_args__ = (
+        Index('ix_user_messages_user_name_id', 'user_name', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    date: Mapped[str] = mapped_column()
+    date: Mapped[str] = mapped_column(index=True)
     message: Mapped[str] = mapped_column()
     user_name: Mapped[str] = mapped_column(ForeignKey('users.username'))
 
     user: Mapped['User'] = relationship(back_populates='messages')
+
+
+class UserSession(Base):
+    """
+    Сессия пользователя, выданная при входе или регистрации.
+
+    Attributes:
+        token_hash (Mapped[str]): SHA-256 токена сессии (сам токен не хранится)
+        user_id (Mapped[int]): Внешний ключ к пользователю
+        created (Mapped[str]): Дата и время создания сессии
+    """
+    __tablename__: str = 'user_sessions'
+
+    token_hash: Mapped[str] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    created: Mapped[str] = mapped_column()
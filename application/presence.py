@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+"""Журнал фонового потока снятия просроченных статусов."""
+
+
+class PresenceTracker:
+    """
+    Хранит в памяти, какие пользователи сейчас в сети.
+
+    Клиент считается подключенным, пока присылает heartbeat: если от него
+    не было сигнала дольше ttl секунд, он переводится в статус «не в сети».
+    Статусы не записываются в базу данных; после перезапуска сервера
+    пользователи снова появляются в сети с первым heartbeat.
+
+    Attributes:
+        ttl: Время, в течение которого пользователь считается в сети после сигнала, в секундах
+    """
+
+    def __init__(self, ttl: float, on_expire: Optional[Callable[[List[int]], None]] = None) -> None:
+        """
+        Инициализирует трекер.
+
+        Args:
+            ttl: Время жизни статуса «в сети» после последнего сигнала, в секундах
+            on_expire: Вызывается из фонового потока со списком ID пользователей,
+                у которых истек срок статуса
+        """
+        self.ttl = ttl
+        self.on_expire = on_expire
+        self._lock: threading.Lock = threading.Lock()
+        self._last_seen: Dict[int, float] = {}
+        self._reaper: Optional[threading.Thread] = None
+
+    def touch(self, user_id: int) -> bool:
+        """
+        Отмечает сигнал от пользователя.
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            bool: True, если пользователь только что перешел в статус «в сети»
+        """
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self.run, name='presence-reaper', daemon=True)
+                self._reaper.start()
+            came_online: bool = user_id not in self._last_seen
+            self._last_seen[user_id] = time.monotonic()
+        return came_online
+
+    def set_offline(self, user_id: int) -> bool:
+        """
+        Переводит пользователя в статус «не в сети» (при выходе из клиента).
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            bool: True, если пользователь был в сети
+        """
+        with self._lock:
+            return self._last_seen.pop(user_id, None) is not None
+
+    def online_ids(self) -> Set[int]:
+        """
+        Возвращает ID пользователей в сети.
+
+        Returns:
+            Set[int]: Снимок множества пользователей в сети
+        """
+        with self._lock:
+            return set(self._last_seen)
+
+    def expire(self) -> List[int]:
+        """
+        Переводит в статус «не в сети» пользователей, от которых давно не было сигналов.
+
+        Returns:
+            List[int]: ID пользователей, у которых истек срок статуса
+        """
+        deadline: float = time.monotonic() - self.ttl
+        with self._lock:
+            expired: List[int] = [user_id for user_id, seen in self._last_seen.items() if seen < deadline]
+            for user_id in expired:
+                del self._last_seen[user_id]
+        return expired
+
+    def run(self) -> None:
+        """Цикл фонового потока: периодически снимает просроченные статусы."""
+        while True:
+            time.sleep(max(self.ttl / 3, 0.1))
+            expired: List[int] = self.expire()
+            if expired and self.on_expire is not None:
+                try:
+                    self.on_expire(expired)
+                except Exception:
+                    logger.exception('Ошибка обработки просроченных статусов')
@@ -0,0 +1,246 @@
+import html
+import re
+from contextlib import contextmanager
+from typing import Iterator, List, Any, Optional
+
+from sqlalchemy import Connection, inspect, text, Row
+from sqlalchemy.orm import Session
+
+
+USERS_FTS_DDL: List[str] = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, user_info, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_user_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, user_info) VALUES (new.id, new.username, '');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_user_update AFTER UPDATE OF username ON users BEGIN
+        UPDATE users_fts SET username = new.username WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_user_delete AFTER DELETE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_profile_insert AFTER INSERT ON user_profiles BEGIN
+        UPDATE users_fts SET user_info = new.user_info WHERE rowid = new.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_profile_update AFTER UPDATE OF user_info ON user_profiles BEGIN
+        UPDATE users_fts SET user_info = new.user_info WHERE rowid = new.user_id;
+    END
+    """,
+]
+"""DDL полнотекстового индекса пользователей и триггеров, поддерживающих его актуальность."""
+
+USERS_FTS_BACKFILL: str = """
+    INSERT INTO users_fts(rowid, username, user_info)
+    SELECT users.id, users.username, coalesce(user_profiles.user_info, '')
+    FROM users LEFT JOIN user_profiles ON user_profiles.user_id = users.id
+"""
+"""Заполнение индекса пользователей, созданного для уже существующей базы данных."""
+
+MESSAGES_FTS_DDL: List[str] = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        message, content = 'user_messages', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON user_messages BEGIN
+        INSERT INTO messages_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON user_messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF message ON user_messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO messages_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+]
+"""
+DDL полнотекстового индекса сообщений. Индекс ссылается на текст в user_messages
+(external content) и не хранит его копию.
+"""
+
+MESSAGES_FTS_BACKFILL: str = "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"
+"""Построение индекса сообщений для уже существующей базы данных."""
+
+MESSAGES_FTS_BULK_INSERT: str = """
+    INSERT INTO messages_fts(rowid, message)
+    SELECT id, message FROM user_messages WHERE id > ?
+"""
+"""Индексация сообщений, вставленных пакетом после сообщения с указанным ID."""
+
+SNIPPET_START: str = '\x01'
+"""Служебный маркер начала совпадения во фрагменте, заменяется на <b> после экранирования."""
+
+SNIPPET_END: str = '\x02'
+"""Служебный маркер конца совпадения во фрагменте, заменяется на </b> после экранирования."""
+
+MESSAGES_SEARCH_SQL = text("""
+    SELECT user_messages.id, user_messages.user_name, user_messages.message, user_messages.date,
+           snippet(messages_fts, 0, char(1), char(2), '…', 16) AS snippet
+    FROM messages_fts
+    JOIN user_messages ON user_messages.id = messages_fts.rowid
+    WHERE messages_fts MATCH :query
+      AND (:sender IS NULL OR user_messages.user_name = :sender)
+      AND (:date_from IS NULL OR user_messages.date >= :date_from)
+      AND (:date_to IS NULL OR user_messages.date < :date_to)
+    ORDER BY messages_fts.rank, user_messages.id DESC
+    LIMIT :limit OFFSET :offset
+""")
+"""Поиск сообщений по индексу с фильтрами по отправителю и периоду."""
+
+USERS_SEARCH_SQL = text("""
+    SELECT users.id, users.username, user_profiles.user_info
+    FROM users_fts
+    JOIN users ON users.id = users_fts.rowid
+    LEFT JOIN user_profiles ON user_profiles.user_id = users.id
+    WHERE users_fts MATCH :query
+    ORDER BY bm25(users_fts, 10.0, 1.0), users.id
+    LIMIT :limit OFFSET :offset
+""")
+"""Поиск пользователей по индексу; совпадения в имени весят больше, чем в описании."""
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Создает полнотекстовые индексы FTS5 и триггеры синхронизации.
+
+    Если индекс создается для базы данных с уже существующими данными,
+    он заполняется ими.
+
+    Args:
+        connection: Соединение с базой данных SQLite в открытой транзакции
+    """
+    inspector = inspect(connection)
+    indexes = (
+        (USERS_FTS_DDL, USERS_FTS_BACKFILL, not inspector.has_table('users_fts')),
+        (MESSAGES_FTS_DDL, MESSAGES_FTS_BACKFILL, not inspector.has_table('messages_fts')),
+    )
+
+    for ddl, backfill, is_new in indexes:
+        for statement in ddl:
+            connection.exec_driver_sql(statement)
+        if is_new:
+            connection.exec_driver_sql(backfill)
+
+
+@contextmanager
+def bulk_message_indexing(connection: Connection) -> Iterator[int]:
+    """
+    Откладывает индексацию сообщений, вставляемых пакетом, до конца пакета.
+
+    Триггер индексации на время пакета удаляется и после вставки создается
+    заново, а новые сообщения индексируются одним запросом: это во много раз
+    быстрее, чем срабатывание триггера на каждую строку. Вызывается внутри
+    транзакции, уже удерживающей блокировку записи (BEGIN IMMEDIATE), поэтому
+    другие соединения не видят базу без триггера.
+
+    Args:
+        connection: Соединение с базой данных в транзакции записи
+
+    Yields:
+        int: ID последнего сообщения перед вставкой пакета
+    """
+    last_id: int = connection.exec_driver_sql('SELECT coalesce(max(id), 0) FROM user_messages').scalar()
+    connection.exec_driver_sql('DROP TRIGGER IF EXISTS messages_fts_insert')
+    yield last_id
+    connection.exec_driver_sql(MESSAGES_FTS_BULK_INSERT, (last_id,))
+    connection.exec_driver_sql(MESSAGES_FTS_DDL[1])
+
+
+def fts_query(query: str) -> str:
+    """
+    Преобразует пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова должны присутствовать.
+    Слова берутся в кавычки, поэтому операторы FTS5 из ввода не интерпретируются.
+
+    Args:
+        query: Строка поиска
+
+    Returns:
+        str: Выражение для MATCH или пустая строка, если слов нет
+    """
+    words: List[str] = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_users(session: Session, query: str, limit: int, offset: int) -> List[Row[Any]]:
+    """
+    Ищет пользователей по имени и описанию.
+
+    Args:
+        session: Сессия базы данных
+        query: Строка поиска
+        limit: Максимальное количество результатов
+        offset: Количество пропускаемых результатов
+
+    Returns:
+        List[Row[Any]]: Строки с полями id, username и user_info, по релевантности
+    """
+    match: str = fts_query(query)
+    if not match:
+        return []
+    return session.execute(
+        USERS_SEARCH_SQL, {'query': match, 'limit': limit, 'offset': offset}
+    ).all()
+
+
+def highlight_snippet(snippet: str) -> str:
+    """
+    Экранирует фрагмент сообщения для HTML и выделяет совпадения тегом <b>.
+
+    Args:
+        snippet: Фрагмент со служебными маркерами SNIPPET_START и SNIPPET_END
+
+    Returns:
+        str: Безопасный HTML-фрагмент
+    """
+    return html.escape(snippet).replace(SNIPPET_START, '<b>').replace(SNIPPET_END, '</b>')
+
+
+def search_messages(session: Session, query: str, sender: Optional[str], date_from: Optional[str],
+                    date_to: Optional[str], limit: int, offset: int) -> List[Row[Any]]:
+    """
+    Ищет сообщения по тексту с необязательными фильтрами.
+
+    Args:
+        session: Сессия базы данных
+        query: Строка поиска
+        sender: Имя отправителя
+        date_from: Начало периода (включительно) в формате дат UserMessage.date
+        date_to: Конец периода (не включительно) в формате дат UserMessage.date
+        limit: Максимальное количество результатов
+        offset: Количество пропускаемых результатов
+
+    Returns:
+        List[Row[Any]]: Строки с полями id, user_name, message, date и snippet, по релевантности
+    """
+    match: str = fts_query(query)
+    if not match:
+        return []
+    return session.execute(MESSAGES_SEARCH_SQL, {
+        'query': match,
+        'sender': sender,
+        'date_from': date_from,
+        'date_to': date_to,
+        'limit': limit,
+        'offset': offset
+    }).all()
@@ -0,0 +1,188 @@
+import json
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+ORJSON_OPTIONS: int = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+"""
+Параметры orjson: ключи-числа, как в модуле json, и даты через
+DefaultJSONProvider.default (формат HTTP-даты, как у Flask по умолчанию).
+"""
+
+
+class RawJSON:
+    """
+    Заранее сериализованный фрагмент JSON, вставляемый в ответ как есть.
+
+    Attributes:
+        json: Текст фрагмента (корректное значение JSON)
+    """
+    __slots__ = ('json',)
+
+    def __init__(self, text: str) -> None:
+        """
+        Инициализирует фрагмент.
+
+        Args:
+            text: Текст фрагмента
+        """
+        self.json = text
+
+    @classmethod
+    def array(cls, fragments: Iterable[str]) -> 'RawJSON':
+        """
+        Собирает JSON-массив из готовых фрагментов без повторной сериализации.
+
+        Args:
+            fragments: Тексты элементов массива
+
+        Returns:
+            RawJSON: Массив JSON
+        """
+        return cls('[' + ','.join(fragments) + ']')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Провайдер JSON для Flask с быстрым кодировщиком.
+
+    Использует orjson, если он установлен, и стандартный модуль json иначе.
+    Ответы сериализуются компактно, без сортировки ключей и экранирования
+    не-ASCII символов. Значения RawJSON вставляются в результат без повторной
+    сериализации: кодировщик заменяет их метками со случайным префиксом,
+    которые затем подставляются одним проходом по готовому тексту.
+    """
+
+    def __init__(self, app: flask.Flask) -> None:
+        """
+        Инициализирует провайдер.
+
+        Args:
+            app: Flask-приложение
+        """
+        super().__init__(app)
+        self._marker: str = secrets.token_hex(8)
+        self._marker_pattern: re.Pattern = re.compile(f'"{self._marker}(\\d+)"')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Сериализует объект в JSON.
+
+        Args:
+            obj: Объект для сериализации
+            **kwargs: Параметры json.dumps; если они переданы, используется модуль json
+
+        Returns:
+            str: Текст JSON
+        """
+        fragments: List[str] = []
+
+        def default(value: Any) -> Any:
+            """Заменяет RawJSON меткой, остальные типы передает DefaultJSONProvider."""
+            if isinstance(value, RawJSON):
+                fragments.append(value.json)
+                return f'{self._marker}{len(fragments) - 1}'
+            return self.default(value)
+
+        if orjson is not None and not kwargs:
+            text: str = orjson.dumps(obj, default=default, option=ORJSON_OPTIONS).decode()
+        else:
+            kwargs.setdefault('ensure_ascii', False)
+            if 'indent' not in kwargs:
+                kwargs.setdefault('separators', (',', ':'))
+            text = json.dumps(obj, default=default, **kwargs)
+
+        if fragments:
+            text = self._marker_pattern.sub(lambda match: fragments[int(match.group(1))], text)
+        return text
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Разбирает JSON.
+
+        Args:
+            s: Текст или байты JSON
+            **kwargs: Параметры json.loads; если они переданы, используется модуль json
+
+        Returns:
+            Any: Разобранный объект
+        """
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> flask.Response:
+        """
+        Формирует ответ application/json (используется flask.jsonify).
+
+        Returns:
+            flask.Response: Ответ с сериализованным объектом
+        """
+        obj: Any = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj), mimetype=self.mimetype)
+
+
+class FragmentCache:
+    """
+    Кэш сериализованных в JSON неизменяемых записей (сообщений) по ID.
+
+    Сообщение сериализуется один раз и затем вставляется во все ответы,
+    где оно встречается. Давно не использованные записи вытесняются.
+
+    Attributes:
+        max_size: Максимальное количество записей в кэше
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Инициализирует кэш.
+
+        Args:
+            max_size: Максимальное количество записей в кэше
+        """
+        self.max_size = max(1, max_size)
+        self._lock: threading.Lock = threading.Lock()
+        self._fragments: OrderedDict[int, str] = OrderedDict()
+
+    def get_many(self, ids: List[int]) -> List[Optional[str]]:
+        """
+        Возвращает фрагменты записей.
+
+        Args:
+            ids: ID записей
+
+        Returns:
+            List[Optional[str]]: Фрагменты в порядке ids (None для отсутствующих в кэше)
+        """
+        with self._lock:
+            fragments: List[Optional[str]] = [self._fragments.get(record_id) for record_id in ids]
+            if len(ids) < self.max_size:
+                for record_id, fragment in zip(ids, fragments):
+                    if fragment is not None:
+                        self._fragments.move_to_end(record_id)
+            return fragments
+
+    def put_many(self, fragments: Dict[int, str]) -> None:
+        """
+        Сохраняет фрагменты записей.
+
+        Args:
+            fragments: Фрагменты по ID записей
+        """
+        with self._lock:
+            self._fragments.update(fragments)
+            for record_id in fragments:
+                self._fragments.move_to_end(record_id)
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
@@ -0,0 +1,184 @@
+import datetime
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from application.models import User, UserProfile, UserSession
+
+
+class SessionInfo:
+    """
+    Данные пользователя, которому принадлежит сессия.
+
+    Attributes:
+        user_id: ID пользователя
+        username: Имя пользователя
+        user_info: Информация о пользователе
+    """
+    __slots__ = ('user_id', 'username', 'user_info')
+
+    def __init__(self, user_id: int, username: str, user_info: str) -> None:
+        """
+        Инициализирует данные сессии.
+
+        Args:
+            user_id: ID пользователя
+            username: Имя пользователя
+            user_info: Информация о пользователе
+        """
+        self.user_id = user_id
+        self.username = username
+        self.user_info = user_info
+
+
+class SessionStore:
+    """
+    Токены сессий пользователей с кэшем в памяти.
+
+    Сессии хранятся в таблице user_sessions (по хешу токена) и переживают
+    перезапуск сервера. Проверка токена сначала ищет его в LRU-кэше
+    ограниченного размера и обращается к базе данных только при промахе.
+
+    Attributes:
+        max_size: Максимальное количество сессий в кэше
+        cache_ttl: Время, через которое сессия из кэша снова проверяется по базе данных, в секундах
+        lifetime: Срок действия сессии с момента создания
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_size: int, cache_ttl: float,
+                 lifetime: datetime.timedelta) -> None:
+        """
+        Инициализирует хранилище сессий.
+
+        Args:
+            session_factory: Фабрика сессий базы данных
+            max_size: Максимальное количество сессий в кэше
+            cache_ttl: Время, через которое сессия из кэша снова проверяется по базе данных, в секундах
+            lifetime: Срок действия сессии с момента создания
+        """
+        self.max_size = max(1, max_size)
+        self.cache_ttl = cache_ttl
+        self.lifetime = lifetime
+        self._session_factory = session_factory
+        self._lock: threading.Lock = threading.Lock()
+        self._cache: OrderedDict[str, Tuple[SessionInfo, float]] = OrderedDict()
+
+    @staticmethod
+    def token_hash(token: str) -> str:
+        """
+        Возвращает хеш токена, под которым сессия хранится в базе данных.
+
+        Args:
+            token: Токен сессии
+
+        Returns:
+            str: SHA-256 токена в шестнадцатеричном виде
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def oldest_valid(self) -> str:
+        """
+        Возвращает самую раннюю дату создания действующей сессии.
+
+        Returns:
+            str: Дата в формате UserSession.created
+        """
+        return str(datetime.datetime.now() - self.lifetime)
+
+    def remember(self, token_hash: str, info: SessionInfo) -> None:
+        """
+        Помещает сессию в кэш, вытесняя давно не использованные.
+
+        Args:
+            token_hash: Хеш токена
+            info: Данные сессии
+        """
+        with self._lock:
+            self._cache[token_hash] = (info, time.monotonic() + self.cache_ttl)
+            self._cache.move_to_end(token_hash)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def create(self, session: Session, info: SessionInfo) -> str:
+        """
+        Выдает новый токен сессии.
+
+        Сессия добавляется в переданную сессию базы данных и сохраняется
+        вместе с ее транзакцией; в кэш она попадает сразу. Истекшие сессии
+        удаляются в той же транзакции.
+
+        Args:
+            session: Сессия базы данных, которую вызывающий код зафиксирует
+            info: Данные пользователя
+
+        Returns:
+            str: Токен сессии
+        """
+        token: str = secrets.token_urlsafe(32)
+        token_hash: str = self.token_hash(token)
+        session.execute(delete(UserSession).where(UserSession.created <= self.oldest_valid()))
+        session.add(UserSession(
+            token_hash=token_hash,
+            user_id=info.user_id,
+            created=str(datetime.datetime.now())
+        ))
+        self.remember(token_hash, info)
+        return token
+
+    def resolve(self, token: Optional[str]) -> Optional[SessionInfo]:
+        """
+        Находит пользователя по токену сессии.
+
+        Args:
+            token: Токен сессии
+
+        Returns:
+            Optional[SessionInfo]: Данные сессии или None, если токен неизвестен или истек
+        """
+        if not token:
+            return None
+
+        token_hash: str = self.token_hash(token)
+        with self._lock:
+            cached: Optional[Tuple[SessionInfo, float]] = self._cache.get(token_hash)
+            if cached is not None and cached[1] > time.monotonic():
+                self._cache.move_to_end(token_hash)
+                return cached[0]
+
+        oldest: str = self.oldest_valid()
+        with self._session_factory() as session:
+            row = session.execute(
+                select(User.id, User.username, UserProfile.user_info)
+                .join(UserSession, UserSession.user_id == User.id)
+                .outerjoin(UserProfile, UserProfile.user_id == User.id)
+                .where(UserSession.token_hash == token_hash, UserSession.created > oldest)
+            ).first()
+
+        if row is None:
+            with self._lock:
+                self._cache.pop(token_hash, None)
+            return None
+
+        info = SessionInfo(row.id, row.username, row.user_info or '')
+        self.remember(token_hash, info)
+        return info
+
+    def revoke(self, token: str) -> None:
+        """
+        Завершает сессию.
+
+        Args:
+            token: Токен сессии
+        """
+        token_hash: str = self.token_hash(token)
+        with self._lock:
+            self._cache.pop(token_hash, None)
+        with self._session_factory() as session:
+            session.execute(delete(UserSession).where(UserSession.token_hash == token_hash))
+            session.commit()
@@ -0,0 +1,133 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from application.models import UserMessage
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+"""Журнал фонового потока записи сообщений."""
+
+
+class MessageWriter:
+    """
+    Записывает сообщения в базу данных группами (group commit).
+
+    Запросы кладут сообщения в очередь и ждут результата. Фоновый поток
+    забирает из очереди до batch_size сообщений, ожидая следующие не дольше
+    max_delay секунд после первого, и сохраняет всю группу одной транзакцией.
+    Так при всплеске нагрузки одна синхронизация с диском приходится
+    на группу сообщений, а не на каждое сообщение.
+
+    Attributes:
+        batch_size: Максимальное количество сообщений в одной транзакции
+        max_delay: Максимальное время набора группы после первого сообщения, в секундах
+    """
+
+    def __init__(self, session_factory: Callable[..., Session],
+                 on_commit: Callable[[List[UserMessage]], None],
+                 batch_size: int = 100, max_delay: float = 0.005) -> None:
+        """
+        Инициализирует писатель сообщений.
+
+        Args:
+            session_factory: Фабрика сессий базы данных
+            on_commit: Вызывается с сохраненными сообщениями после фиксации каждой группы
+            batch_size: Максимальное количество сообщений в одной транзакции
+            max_delay: Максимальное время набора группы после первого сообщения, в секундах
+        """
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max(0.0, max_delay)
+        self._session_factory = session_factory
+        self._on_commit = on_commit
+        self._queue: queue.Queue[Optional[Tuple[UserMessage, Future]]] = queue.Queue()
+        self._lock: threading.Lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, message: UserMessage) -> 'Future[int]':
+        """
+        Ставит сообщение в очередь на запись.
+
+        Args:
+            message: Новое сообщение
+
+        Returns:
+            Future[int]: Результат с ID сообщения после фиксации транзакции
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name='message-writer', daemon=True)
+                self._thread.start()
+
+        future: Future = Future()
+        self._queue.put((message, future))
+        return future
+
+    def stop(self) -> None:
+        """Дописывает сообщения, уже стоящие в очереди, и останавливает фоновый поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def next_batch(self) -> Tuple[List[Tuple[UserMessage, Future]], bool]:
+        """
+        Ожидает первое сообщение и набирает к нему группу.
+
+        Returns:
+            Tuple[List[Tuple[UserMessage, Future]], bool]: Сообщения группы
+                и признак того, что поступил запрос на остановку
+        """
+        item = self._queue.get()
+        if item is None:
+            return [], True
+
+        batch: List[Tuple[UserMessage, Future]] = [item]
+        deadline: float = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self) -> None:
+        """Цикл фонового потока: набирает группы сообщений и записывает их."""
+        stopping = False
+        while not stopping:
+            batch, stopping = self.next_batch()
+            if batch:
+                self.write(batch)
+
+    def write(self, batch: List[Tuple[UserMessage, Future]]) -> None:
+        """
+        Сохраняет группу сообщений одной транзакцией и сообщает результат ожидающим.
+
+        Args:
+            batch: Сообщения и их ожидаемые результаты
+        """
+        messages: List[UserMessage] = [message for message, _ in batch]
+        try:
+            with self._session_factory(expire_on_commit=False) as session:
+                session.add_all(messages)
+                session.commit()
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        try:
+            self._on_commit(messages)
+        except Exception:
+            logger.exception('Ошибка обработки сохраненных сообщений')
+        for message, future in batch:
+            future.set_result(message.id)
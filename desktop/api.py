@@ -0,0 +1,266 @@
+import os
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+SERVER_URL: str = os.environ.get('TSV_SERVER_URL', 'http://127.0.0.1:5000')
+"""Адрес сервера чата."""
+
+REQUEST_TIMEOUT: Tuple[float, float] = (5, 15)
+"""Таймауты подключения к серверу и ожидания ответа для обычных запросов, в секундах."""
+
+RETRY_TOTAL: int = 3
+"""Количество повторов запроса при ошибке соединения или временной недоступности сервера."""
+
+RETRY_BACKOFF: float = 0.5
+"""Базовая задержка экспоненциальной паузы между повторами, в секундах (0.5, 1, 2, ...)."""
+
+RETRY_STATUSES: Tuple[int, ...] = (502, 503, 504)
+"""HTTP-статусы временной недоступности сервера, при которых запрос повторяется."""
+
+POOL_SIZE: int = 8
+"""Количество соединений keep-alive с сервером, хранимых в пуле."""
+
+UsersResult = Optional[Tuple[Optional[str], Dict[int, Dict[str, Any]]]]
+"""ETag и пользователи по ID или None, если список не изменился (ответ 304)."""
+
+
+class ChatApi:
+    """
+    Клиент API сервера чата.
+
+    Все запросы идут через одну сессию requests: соединения с сервером
+    переиспользуются (keep-alive) из пула вместо установки нового TCP-соединения
+    на каждый запрос. При ошибке подключения и ответах 502/503/504 запрос
+    повторяется с экспоненциальной паузой; неидемпотентные запросы (POST)
+    повторяются, только если они не дошли до сервера.
+
+    Методы не обращаются к виджетам и могут вызываться из фоновых потоков.
+
+    Attributes:
+        base_url: Адрес сервера
+        timeout: Таймауты подключения и ожидания ответа, в секундах
+        session: Сессия requests с пулом соединений
+    """
+
+    def __init__(self, base_url: str = SERVER_URL, timeout: Tuple[float, float] = REQUEST_TIMEOUT,
+                 retries: int = RETRY_TOTAL, backoff: float = RETRY_BACKOFF) -> None:
+        """
+        Инициализирует клиент.
+
+        Args:
+            base_url: Адрес сервера
+            timeout: Таймауты подключения и ожидания ответа, в секундах
+            retries: Количество повторов запроса
+            backoff: Базовая задержка между повторами, в секундах
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session: requests.Session = requests.Session()
+
+        retry: Retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False
+        )
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path: str) -> str:
+        """
+        Возвращает полный адрес метода API.
+
+        Args:
+            path: Путь метода, например '/users'
+
+        Returns:
+            str: Адрес на сервере
+        """
+        return self.base_url + path
+
+    @staticmethod
+    def auth_headers(token: str) -> Dict[str, str]:
+        """
+        Возвращает заголовок с токеном сессии.
+
+        Args:
+            token: Токен сессии пользователя
+
+        Returns:
+            Dict[str, str]: Заголовок Authorization
+        """
+        return {'Authorization': f'Bearer {token}'}
+
+    def register(self, username: str, password: str, user_info: str) -> Dict[str, Any]:
+        """
+        Регистрирует пользователя.
+
+        Args:
+            username: Имя пользователя
+            password: Пароль
+            user_info: Информация о пользователе
+
+        Returns:
+            Dict[str, Any]: Ответ /register с данными пользователя и токеном сессии
+        """
+        return self.session.post(
+            self.url('/register'),
+            json={'username': username, 'password': password, 'user_info': user_info},
+            timeout=self.timeout
+        ).json()
+
+    def login(self, username: str, password: str) -> Dict[str, Any]:
+        """
+        Выполняет вход пользователя.
+
+        Args:
+            username: Имя пользователя
+            password: Пароль
+
+        Returns:
+            Dict[str, Any]: Ответ /login с данными пользователя и токеном сессии
+        """
+        return self.session.get(
+            self.url('/login'),
+            json={'username': username, 'password': password},
+            timeout=self.timeout
+        ).json()
+
+    def users(self, etag: Optional[str] = None) -> UsersResult:
+        """
+        Запрашивает список пользователей условным запросом с If-None-Match.
+
+        Args:
+            etag: ETag последнего полученного списка
+
+        Returns:
+            UsersResult: ETag и пользователи по ID или None, если список не изменился
+        """
+        headers: Dict[str, str] = {'If-None-Match': etag} if etag else {}
+        response: requests.Response = self.session.get(
+            self.url('/users'), params={'format': 'rows'}, headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 304:
+            return None
+        return response.headers.get('ETag'), {user['id']: user for user in response.json()['users']}
+
+    def messages(self, after_id: int) -> Dict[str, Any]:
+        """
+        Запрашивает сообщения, отправленные после указанного.
+
+        Args:
+            after_id: ID последнего сообщения, известного клиенту
+
+        Returns:
+            Dict[str, Any]: Ответ /messages
+        """
+        return self.session.get(
+            self.url('/messages'), params={'after_id': after_id}, timeout=self.timeout
+        ).json()
+
+    def history(self, limit: int, before_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Запрашивает страницу истории сообщений.
+
+        Args:
+            limit: Размер страницы
+            before_id: ID самого старого загруженного сообщения (без него — последняя страница)
+
+        Returns:
+            Dict[str, Any]: Ответ /history
+        """
+        params: Dict[str, int] = {'limit': limit}
+        if before_id is not None:
+            params['before_id'] = before_id
+        return self.session.get(self.url('/history'), params=params, timeout=self.timeout).json()
+
+    def search_messages(self, params: Dict[str, Union[str, int]]) -> Dict[str, Any]:
+        """
+        Ищет сообщения.
+
+        Args:
+            params: Параметры /messages/search (q, sender, date_from, date_to, limit, offset)
+
+        Returns:
+            Dict[str, Any]: Ответ /messages/search
+        """
+        return self.session.get(self.url('/messages/search'), params=params, timeout=self.timeout).json()
+
+    def send_message(self, token: str, text: str) -> Dict[str, Any]:
+        """
+        Отправляет сообщение.
+
+        Args:
+            token: Токен сессии отправителя
+            text: Текст сообщения
+
+        Returns:
+            Dict[str, Any]: Ответ /send_message
+        """
+        return self.session.post(
+            self.url('/send_message'), json={'text': text}, headers=self.auth_headers(token), timeout=self.timeout
+        ).json()
+
+    def heartbeat(self, token: str, timeout: float) -> None:
+        """
+        Подтверждает, что клиент в сети.
+
+        Args:
+            token: Токен сессии пользователя
+            timeout: Таймаут запроса, в секундах
+        """
+        self.session.post(self.url('/heartbeat'), headers=self.auth_headers(token), timeout=timeout)
+
+    def change_state(self, token: str) -> None:
+        """
+        Сообщает о выходе пользователя и завершает его сессию.
+
+        Args:
+            token: Токен сессии пользователя
+        """
+        self.session.post(self.url('/change_state'), headers=self.auth_headers(token), timeout=self.timeout)
+
+    def updates(self, after_id: int, users_version: int, wait: int) -> Dict[str, Any]:
+        """
+        Ожидает изменений на сервере (long polling).
+
+        Args:
+            after_id: ID последнего полученного сообщения
+            users_version: Версия списка пользователей, известная клиенту
+            wait: Время, на которое сервер удерживает запрос, в секундах
+
+        Returns:
+            Dict[str, Any]: Ответ /updates
+        """
+        return self.session.get(
+            self.url('/updates'),
+            params={'after_id': after_id, 'users_version': users_version, 'timeout': wait, 'format': 'rows'},
+            timeout=(self.timeout[0], wait + 10)
+        ).json()
+
+    def stream(self, after_id: int, read_timeout: float) -> requests.Response:
+        """
+        Открывает поток Server-Sent Events.
+
+        Args:
+            after_id: ID последнего полученного сообщения
+            read_timeout: Время без данных, после которого поток считается оборванным, в секундах
+
+        Returns:
+            requests.Response: Потоковый ответ /stream
+        """
+        return self.session.get(
+            self.url('/stream'),
+            headers={'Accept': 'text/event-stream', 'Last-Event-ID': str(after_id)},
+            stream=True,
+            timeout=(self.timeout[0], read_timeout)
+        )
+
+
+API: ChatApi = ChatApi()
+"""Общий клиент API окон приложения."""
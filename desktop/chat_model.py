@@ -0,0 +1,234 @@
+from typing import List, Dict, Any, Optional
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QListView
+
+
+AUTHOR_ROLE: int = Qt.ItemDataRole.UserRole + 1
+"""Роль модели для имени автора сообщения."""
+
+IS_MINE_ROLE: int = Qt.ItemDataRole.UserRole + 2
+"""Роль модели для признака собственного сообщения."""
+
+ID_ROLE: int = Qt.ItemDataRole.UserRole + 3
+"""Роль модели для ID сообщения на сервере."""
+
+
+class ChatMessageModel(QAbstractListModel):
+    """
+    Модель сообщений чата.
+
+    Хранит только данные сообщений; виджеты для них не создаются,
+    отрисовкой видимых строк занимается ChatMessageDelegate.
+
+    Attributes:
+        messages: Сообщения в порядке отображения
+    """
+
+    def __init__(self, parent: Optional[Any] = None) -> None:
+        """
+        Инициализирует пустую модель.
+
+        Args:
+            parent: Родительский объект
+        """
+        super().__init__(parent)
+        self.messages: List[Dict[str, Any]] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """
+        Возвращает количество сообщений.
+
+        Args:
+            parent: Родительский индекс (для списка всегда невалидный)
+
+        Returns:
+            int: Количество строк модели
+        """
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """
+        Возвращает данные сообщения для указанной роли.
+
+        Args:
+            index: Индекс строки
+            role: Роль данных
+
+        Returns:
+            Any: Текст, автор, признак своего сообщения, ID или None
+        """
+        if not index.isValid() or not 0 <= index.row() < len(self.messages):
+            return None
+
+        message = self.messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message['text']
+        if role == AUTHOR_ROLE:
+            return message['author']
+        if role == IS_MINE_ROLE:
+            return message['is_mine']
+        if role == ID_ROLE:
+            return message['id']
+        return None
+
+    def append_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Добавляет сообщения в конец чата.
+
+        Args:
+            messages: Сообщения с полями 'id', 'author', 'text' и 'is_mine'
+        """
+        if not messages:
+            return
+        first = len(self.messages)
+        self.beginInsertRows(QModelIndex(), first, first + len(messages) - 1)
+        self.messages.extend(messages)
+        self.endInsertRows()
+
+    def prepend_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Добавляет более старые сообщения в начало чата.
+
+        Args:
+            messages: Сообщения с полями 'id', 'author', 'text' и 'is_mine'
+        """
+        if not messages:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self.messages[0:0] = messages
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """Удаляет все сообщения из чата."""
+        self.beginResetModel()
+        self.messages = []
+        self.endResetModel()
+
+
+class ChatMessageDelegate(QStyledItemDelegate):
+    """
+    Рисует сообщения чата в виде «пузырей».
+
+    Свои сообщения выравниваются вправо и выделяются синим, чужие — влево,
+    серым и с именем автора сверху. Размеры строк кэшируются по ID сообщения
+    и ширине области просмотра.
+
+    Attributes:
+        view: Список, в котором отображаются сообщения
+    """
+    MARGIN: int = 10
+    SPACING: int = 4
+    PADDING_X: int = 12
+    PADDING_Y: int = 8
+    RADIUS: int = 12
+    AUTHOR_HEIGHT: int = 15
+
+    def __init__(self, view: QListView) -> None:
+        """
+        Инициализирует делегат.
+
+        Args:
+            view: Список, в котором отображаются сообщения
+        """
+        super().__init__(view)
+        self.view = view
+        self.author_font: QFont = QFont(view.font())
+        self.author_font.setPixelSize(11)
+        self._size_cache: Dict[int, QSize] = {}
+        self._cache_width: int = -1
+
+    def clear_cache(self) -> None:
+        """Сбрасывает кэш размеров строк (когда под теми же ID оказываются другие сообщения)."""
+        self._size_cache.clear()
+
+    def max_bubble_width(self) -> int:
+        """Возвращает максимальную ширину «пузыря» — половину ширины чата."""
+        return max(self.view.viewport().width() // 2, 2 * self.PADDING_X + 10)
+
+    def text_rect(self, option: QStyleOptionViewItem, text: str) -> QRect:
+        """
+        Вычисляет прямоугольник, который займет текст сообщения с переносами.
+
+        Args:
+            option: Параметры отрисовки
+            text: Текст сообщения
+
+        Returns:
+            QRect: Размер текста с началом в точке (0, 0)
+        """
+        width = self.max_bubble_width() - 2 * self.PADDING_X
+        metrics = QFontMetrics(option.font)
+        return metrics.boundingRect(QRect(0, 0, width, 1_000_000), Qt.TextFlag.TextWordWrap, text)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        """
+        Возвращает размер строки с сообщением.
+
+        Args:
+            option: Параметры отрисовки
+            index: Индекс строки
+
+        Returns:
+            QSize: Ширина области просмотра и высота «пузыря» с отступами
+        """
+        width = self.view.viewport().width()
+        if width != self._cache_width:
+            self._size_cache.clear()
+            self._cache_width = width
+
+        message_id: int = index.data(ID_ROLE)
+        size = self._size_cache.get(message_id)
+        if size is None:
+            height = self.text_rect(option, index.data()).height() + 2 * self.PADDING_Y + self.SPACING
+            if not index.data(IS_MINE_ROLE):
+                height += self.AUTHOR_HEIGHT
+            size = QSize(width, height)
+            self._size_cache[message_id] = size
+        return size
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        """
+        Рисует сообщение.
+
+        Args:
+            painter: Объект рисования
+            option: Параметры отрисовки
+            index: Индекс строки
+        """
+        text: str = index.data()
+        is_mine: bool = index.data(IS_MINE_ROLE)
+        text_size = self.text_rect(option, text)
+        bubble_width = text_size.width() + 2 * self.PADDING_X
+        bubble_height = text_size.height() + 2 * self.PADDING_Y
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        top = option.rect.top()
+        if is_mine:
+            left = option.rect.right() - self.MARGIN - bubble_width
+        else:
+            left = option.rect.left() + self.MARGIN
+            painter.setFont(self.author_font)
+            painter.setPen(QColor('#666'))
+            painter.drawText(
+                QRect(left + 5, top, option.rect.width() - 2 * self.MARGIN, self.AUTHOR_HEIGHT),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                index.data(AUTHOR_ROLE)
+            )
+            top += self.AUTHOR_HEIGHT
+
+        bubble = QRectF(left, top, bubble_width, bubble_height)
+        path = QPainterPath()
+        path.addRoundedRect(bubble, self.RADIUS, self.RADIUS)
+        painter.fillPath(path, QColor('#0084ff') if is_mine else QColor('grey'))
+
+        painter.setFont(option.font)
+        painter.setPen(QColor('white') if is_mine else QColor('black'))
+        painter.drawText(
+            bubble.toRect().adjusted(self.PADDING_X, self.PADDING_Y, -self.PADDING_X, -self.PADDING_Y),
+            Qt.TextFlag.TextWordWrap,
+            text
+        )
+        painter.restore()
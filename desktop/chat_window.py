@@ -0,0 +1,1073 @@
+import html
+import json
+import os
+import threading
+from typing import List, Optional, Dict, Any, Union
+from PyQt6 import QtCore
+from PyQt6.QtCore import Qt, QTimer, QObject, QDate, QEvent, pyqtSignal
+from PyQt6.QtWidgets import (QMainWindow, QWidget, QLineEdit, QMessageBox, QLabel, QListView,
+                             QAbstractItemView, QSizePolicy, QDialog, QVBoxLayout, QHBoxLayout,
+                             QPushButton, QCheckBox, QDateEdit, QTextBrowser)
+from PyQt6.QtGui import QCloseEvent, QHideEvent, QShowEvent
+import requests
+from requests.exceptions import RequestException
+
+from user_interfaces import main_window, modal_profile, profile
+from chat_model import ChatMessageModel, ChatMessageDelegate
+from user_index import UserSearchIndex
+from network import NETWORK
+from api import API, UsersResult
+from local_cache import LocalCache, cache_path
+from polling import AdaptivePoller
+import startup
+
+
+SYNC_MODE: str = os.environ.get('TSV_SYNC_MODE', 'stream')
+"""
+Способ получения обновлений: 'stream' (поток событий /stream),
+'longpoll' (ожидание изменений на /updates) или 'poll' (опрос с адаптивным интервалом).
+"""
+
+LONG_POLL_TIMEOUT: int = 25
+"""Время, на которое сервер удерживает запрос /updates, в секундах."""
+
+STREAM_READ_TIMEOUT: int = 45
+"""Время без данных (включая keep-alive), после которого поток /stream считается оборванным, в секундах."""
+
+HISTORY_PAGE_SIZE: int = 50
+"""Количество сообщений, загружаемых из истории за один раз."""
+
+HISTORY_RETRY_INTERVAL: int = 3
+"""Пауза перед повторной загрузкой первой страницы истории после ошибки, в секундах."""
+
+HEARTBEAT_INTERVAL: int = 10
+"""
+Интервал отправки heartbeat, подтверждающего, что клиент в сети, в секундах.
+Сервер переводит пользователя в статус «не в сети», если heartbeat не приходит дольше TTL (30 с).
+"""
+
+USER_SEARCH_LIMIT: int = 100
+"""Максимальное количество карточек в результатах поиска пользователей."""
+
+MESSAGE_SEARCH_PAGE_SIZE: int = 20
+"""Количество результатов поиска сообщений, загружаемых за один раз."""
+
+
+class UpdatesListener(QObject):
+    """
+    Получает обновления с сервера через long polling в фоновом потоке.
+
+    Attributes:
+        updates_received: Сигнал с ответом сервера на запрос /updates
+        after_id: ID последнего полученного сообщения
+        users_version: Версия списка пользователей, известная клиенту
+    """
+    updates_received = pyqtSignal(dict)
+
+    def __init__(self, after_id: int) -> None:
+        """
+        Инициализирует слушатель обновлений.
+
+        Args:
+            after_id: ID последнего сообщения, уже отображенного в чате
+        """
+        super().__init__()
+        self.after_id = after_id
+        self.users_version = -1
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запускает фоновый поток ожидания обновлений."""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает ожидание обновлений после завершения текущего запроса."""
+        self._stopped.set()
+
+    def run(self) -> None:
+        """Цикл long polling: каждый ответ передается в GUI-поток через сигнал."""
+        while not self._stopped.is_set():
+            try:
+                answer: Dict[str, Any] = API.updates(self.after_id, self.users_version, LONG_POLL_TIMEOUT)
+            except (RequestException, ValueError):
+                self._stopped.wait(2)
+                continue
+
+            self.after_id = answer.get('last_id', self.after_id)
+            self.users_version = answer.get('users_version', self.users_version)
+            if not self._stopped.is_set():
+                self.updates_received.emit(answer)
+
+
+class EventStreamListener(QObject):
+    """
+    Читает поток Server-Sent Events с сервера в фоновом потоке.
+
+    Attributes:
+        message_received: Сигнал с новым сообщением
+        presence_changed: Сигнал с данными пользователя, у которого изменился статус
+        reconnected: Сигнал о повторном подключении (события о статусах за время обрыва потеряны)
+        after_id: ID последнего полученного сообщения
+    """
+    message_received = pyqtSignal(dict)
+    presence_changed = pyqtSignal(dict)
+    reconnected = pyqtSignal()
+
+    def __init__(self, after_id: int) -> None:
+        """
+        Инициализирует слушатель потока событий.
+
+        Args:
+            after_id: ID последнего сообщения, уже отображенного в чате
+        """
+        super().__init__()
+        self.after_id = after_id
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Запускает фоновый поток чтения событий."""
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Останавливает чтение событий.
+
+        Соединение закрывается фоновым потоком при получении следующего
+        события или keep-alive: закрытие из GUI-потока ждало бы окончания
+        блокирующего чтения потока.
+        """
+        self._stopped.set()
+
+    def run(self) -> None:
+        """Подключается к /stream и переподключается при обрыве соединения."""
+        connected_before = False
+        while not self._stopped.is_set():
+            try:
+                with API.stream(self.after_id, STREAM_READ_TIMEOUT) as response:
+                    if connected_before:
+                        self.reconnected.emit()
+                    connected_before = True
+                    self.read_events(response)
+            except (RequestException, ValueError, KeyError):
+                pass
+            self._stopped.wait(2)
+
+    def read_events(self, response: requests.Response) -> None:
+        """
+        Разбирает события из открытого потока до его закрытия.
+
+        Args:
+            response: Потоковый ответ сервера
+        """
+        event: str = 'message'
+        data: List[str] = []
+
+        for line in response.iter_lines(decode_unicode=True):
+            if self._stopped.is_set():
+                return
+
+            if line:
+                field, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if field == 'event':
+                    event = value
+                elif field == 'data':
+                    data.append(value)
+                continue
+
+            if data:
+                payload: Dict[str, Any] = json.loads('\n'.join(data))
+                if event == 'message':
+                    self.after_id = max(self.after_id, payload['id'])
+                    self.message_received.emit(payload)
+                elif event == 'presence':
+                    self.presence_changed.emit(payload)
+            event, data = 'message', []
+
+
+class ChatWindow(QMainWindow, main_window.Ui_MainWindow):
+    """
+    Главное окно чата, отображающее сообщения и список пользователей.
+
+    Attributes:
+        main_user: Данные текущего пользователя
+        wind: Окно профиля пользователя
+        msb: Всплывающее окно для отображения ошибок
+        chat_view: Список сообщений чата (отрисовываются только видимые строки)
+        chat_model: Модель сообщений чата
+        search_offset: Смещение следующей страницы результатов поиска сообщений
+        users: Записи пользователей, полученные с сервера, по ID
+        last_message_id: ID последнего полученного сообщения
+        first_message_id: ID самого старого загруженного сообщения
+        has_older_messages: Есть ли на сервере более старые сообщения
+        scroll_anchor: Расстояние до низа чата, которое нужно сохранить после подгрузки истории
+        users_etag: ETag последнего полученного списка пользователей
+        sync_pending: Выполняется ли запрос новых сообщений
+        users_pending: Выполняется ли запрос списка пользователей
+        history_pending: Выполняется ли запрос страницы истории
+        search_generation: Номер текущего поиска сообщений (ответы на прежние поиски отбрасываются)
+        cache: Локальный кэш сообщений и пользователей
+        profiles: Карточки пользователей по ID (создаются один раз и обновляются на месте)
+        user_order: ID пользователей в порядке отображения
+        visible_user_ids: ID пользователей, карточки которых сейчас размещены в сетке
+        user_index: Поисковый индекс по именам и описаниям пользователей
+        poller: Планировщик опроса сервера (в режиме 'poll')
+        heartbeat_timer: Таймер отправки heartbeat
+        listener: Фоновый слушатель обновлений (в режимах 'stream' и 'longpoll')
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует главное окно чата."""
+        super().__init__()
+        self.setupUi(self)
+        self.initUI()
+
+        self.poller: AdaptivePoller = AdaptivePoller(self.update_data)
+        self.heartbeat_timer: QTimer = QTimer()
+        self.heartbeat_timer.timeout.connect(self.send_heartbeat)
+        self.listener: Optional[Union[EventStreamListener, UpdatesListener]] = None
+
+        self.main_user: Optional[Dict[str, Union[str, int]]] = None
+        self.wind: Optional[UserProfileModal] = None
+        self.msb: QMessageBox = QMessageBox()
+        self.msb.setWindowTitle('Ошибка')
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self.last_message_id: int = 0
+        self.first_message_id: Optional[int] = None
+        self.has_older_messages: bool = True
+        self.scroll_anchor: Optional[int] = None
+        self.users_etag: Optional[str] = None
+        self.sync_pending: bool = False
+        self.users_pending: bool = False
+        self.history_pending: bool = False
+        self.search_generation: int = 0
+        self.cache: LocalCache = LocalCache(cache_path(API.base_url))
+        self.profiles: Dict[int, Profile] = {}
+        self.user_order: List[int] = []
+        self.visible_user_ids: Optional[List[int]] = None
+        self.user_index: UserSearchIndex = UserSearchIndex()
+
+    def initUI(self) -> None:
+        """
+        Инициализирует пользовательский интерфейс главного окна.
+
+        Настраивает соединения сигналов со слотами и заменяет область прокрутки
+        чата списком сообщений с моделью и делегатом.
+        """
+        self.message_btn.clicked.connect(self.send_message)
+        self.my_btn.clicked.connect(self.show_my_profile)
+        self.line_search.textChanged.connect(self.search_users)
+        self.message_line.textChanged.connect(lambda: self.poller.activity())
+
+        self.chat_model = ChatMessageModel(self)
+        self.chat_view = QListView(parent=self.chat)
+        self.chat_view.setGeometry(self.scroll_chat.geometry())
+        self.chat_view.setModel(self.chat_model)
+        self.chat_view.setItemDelegate(ChatMessageDelegate(self.chat_view))
+        self.chat_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.chat_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.chat_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.chat_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.chat_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.chat_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.chat_view.verticalScrollBar().valueChanged.connect(self.on_chat_scrolled)
+        self.chat_view.verticalScrollBar().rangeChanged.connect(self.on_chat_range_changed)
+        self.scroll_chat.deleteLater()
+
+        self.no_results_label = QLabel("Пользователи не найдены", self.scrollAreaWidgetContents_3)
+        self.no_results_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.no_results_label.setStyleSheet("""
+            QLabel {
+                color: #666;
+                font-size: 14px;
+                padding: 20px;
+            }
+        """)
+        self.no_results_label.hide()
+
+        self.init_search_tab()
+
+    def init_search_tab(self) -> None:
+        """Создает вкладку полнотекстового поиска по сообщениям."""
+        self.search_tab = QWidget()
+        layout = QVBoxLayout(self.search_tab)
+
+        filters = QHBoxLayout()
+        self.message_search_line = QLineEdit()
+        self.message_search_line.setPlaceholderText("Текст сообщения")
+        self.sender_search_line = QLineEdit()
+        self.sender_search_line.setPlaceholderText("Отправитель")
+        self.sender_search_line.setMaximumWidth(120)
+        self.period_check = QCheckBox("Период")
+        self.date_from_edit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+            date_edit.setEnabled(False)
+        self.period_check.toggled.connect(self.date_from_edit.setEnabled)
+        self.period_check.toggled.connect(self.date_to_edit.setEnabled)
+        self.message_search_btn = QPushButton("Найти")
+
+        for widget in (self.message_search_line, self.sender_search_line, self.period_check,
+                       self.date_from_edit, self.date_to_edit, self.message_search_btn):
+            filters.addWidget(widget)
+        layout.addLayout(filters)
+
+        self.search_results = QTextBrowser()
+        layout.addWidget(self.search_results)
+        self.search_more_btn = QPushButton("Показать еще")
+        self.search_more_btn.hide()
+        layout.addWidget(self.search_more_btn)
+
+        self.message_search_btn.clicked.connect(self.search_messages)
+        self.message_search_line.returnPressed.connect(self.search_messages)
+        self.search_more_btn.clicked.connect(self.load_search_results)
+        self.search_offset: Optional[int] = None
+
+        self.tabWidget.addTab(self.search_tab, "Поиск")
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """
+        Обрабатывает событие показа окна.
+
+        Чат и список пользователей сразу отображаются из локального кэша,
+        после чего с сервера запрашиваются только сообщения после последнего
+        кэшированного и актуальный список пользователей. Запросы выполняются
+        в фоновых потоках, окно не ждет ответов.
+
+        Args:
+            event: Событие показа окна
+        """
+        if self.first_message_id is None:
+            cached: List[Dict[str, Any]] = self.cache.last_messages(HISTORY_PAGE_SIZE)
+            if cached:
+                self.loading_msg(cached)
+                self.first_message_id = cached[0]['id']
+                self.validate_cache(cached[-1])
+            else:
+                self.load_history()
+        else:
+            self.sync_messages()
+
+        if not self.users:
+            self.users = self.cache.users()
+            if self.users:
+                self.loading_users()
+        self.fetch_users()
+
+        if not self.heartbeat_timer.isActive():
+            self.heartbeat_timer.start(HEARTBEAT_INTERVAL * 1000)
+        if SYNC_MODE == 'poll':
+            self.poller.resume()
+        startup.mark('окно чата показано')
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        """
+        Обрабатывает событие скрытия окна: опрос сервера приостанавливается.
+
+        Args:
+            event: Событие скрытия окна
+        """
+        self.poller.pause()
+        super().hideEvent(event)
+
+    def changeEvent(self, event: QEvent) -> None:
+        """
+        Обрабатывает изменение состояния окна.
+
+        Опрос сервера приостанавливается, пока окно свернуто, и ускоряется,
+        когда окно становится активным.
+
+        Args:
+            event: Событие изменения состояния окна
+        """
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                self.poller.pause()
+            elif SYNC_MODE == 'poll' and self.isVisible():
+                self.poller.resume()
+        elif event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            self.poller.activity()
+        super().changeEvent(event)
+
+    def validate_cache(self, last_cached: Dict[str, Any]) -> None:
+        """
+        Проверяет, что последнее кэшированное сообщение совпадает с сообщением
+        на сервере под тем же ID, и затем запрашивает новые сообщения.
+
+        Args:
+            last_cached: Последнее сообщение из локального кэша
+        """
+        self.sync_pending = True
+        NETWORK.submit(
+            lambda: API.history(1, last_cached['id'] + 1),
+            lambda answer: self.cache_validated(last_cached, answer),
+            self.messages_sync_failed
+        )
+
+    def cache_validated(self, last_cached: Dict[str, Any], answer: Dict[str, Any]) -> None:
+        """
+        Продолжает синхронизацию после проверки кэша.
+
+        Если база данных сервера была заменена, кэш очищается
+        и чат загружается с сервера заново.
+
+        Args:
+            last_cached: Последнее сообщение из локального кэша
+            answer: Ответ сервера на запрос /history с этим сообщением
+        """
+        self.sync_pending = False
+        if answer.get('messages', [])[-1:] == [last_cached]:
+            self.sync_messages()
+            return
+
+        self.cache.clear_messages()
+        self.chat_model.clear()
+        self.chat_view.itemDelegate().clear_cache()
+        self.last_message_id = 0
+        self.first_message_id = None
+        self.has_older_messages = True
+        self.load_history()
+
+    def start_listener(self) -> None:
+        """Запускает фоновый слушатель обновлений после первой загрузки сообщений."""
+        if self.listener is not None:
+            return
+
+        if SYNC_MODE == 'stream':
+            self.listener = EventStreamListener(self.last_message_id)
+            self.listener.message_received.connect(lambda message: self.receive_messages([message]))
+            self.listener.presence_changed.connect(self.apply_presence)
+            self.listener.reconnected.connect(self.refresh_users)
+            self.listener.start()
+        elif SYNC_MODE == 'longpoll':
+            self.listener = UpdatesListener(self.last_message_id)
+            self.listener.updates_received.connect(self.apply_updates)
+            self.listener.start()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """
+        Обрабатывает событие закрытия окна.
+
+        Args:
+            event: Событие закрытия окна
+        """
+        self.poller.pause()
+        self.heartbeat_timer.stop()
+        if self.listener:
+            self.listener.stop()
+        if self.main_user:
+            token: str = self.main_user['token']
+            NETWORK.submit(lambda: API.change_state(token))
+
+    def send_heartbeat(self) -> None:
+        """Сообщает серверу, что клиент все еще в сети."""
+        if self.main_user:
+            token: str = self.main_user['token']
+            NETWORK.submit(lambda: API.heartbeat(token, HEARTBEAT_INTERVAL))
+
+    def update_data(self) -> None:
+        """Обновляет сообщения и список пользователей (вызывается планировщиком опроса)"""
+        if self.main_user:
+            self.sync_messages()
+            self.fetch_users()
+
+    def apply_updates(self, answer: Dict[str, Any]) -> None:
+        """
+        Применяет изменения, полученные через long polling.
+
+        Args:
+            answer: Ответ сервера на запрос /updates
+        """
+        self.receive_messages(answer.get('messages', []))
+
+        if answer.get('users') is not None:
+            self.users = {user['id']: user for user in answer['users']}
+            self.cache.save_users(self.users.values(), replace_all=True)
+            self.loading_users()
+
+    def apply_presence(self, user: Dict[str, Any]) -> None:
+        """
+        Обновляет данные пользователя, полученные из потока событий.
+
+        Args:
+            user: ID, имя, информация и статус пользователя
+        """
+        self.users[user['id']] = user
+        self.cache.save_users([user])
+        self.loading_users()
+
+    def refresh_users(self) -> None:
+        """Заново загружает список пользователей с сервера, если он изменился."""
+        self.fetch_users()
+
+    def fetch_users(self) -> None:
+        """
+        Запрашивает список пользователей условным запросом с If-None-Match.
+
+        Ответ разбирается в фоновом потоке; если список изменился,
+        self.users обновляется и карточки перестраиваются в users_fetched().
+        """
+        if self.users_pending:
+            return
+        self.users_pending = True
+        etag: Optional[str] = self.users_etag
+        NETWORK.submit(lambda: API.users(etag), self.users_fetched, self.users_fetch_failed)
+
+    def users_fetched(self, result: UsersResult) -> None:
+        """
+        Применяет полученный список пользователей.
+
+        Args:
+            result: ETag и пользователи по ID или None, если список не изменился
+        """
+        self.users_pending = False
+        if result is not None:
+            self.users_etag, self.users = result
+            self.cache.save_users(self.users.values(), replace_all=True)
+            self.loading_users()
+
+    def users_fetch_failed(self, error: Exception) -> None:
+        """
+        Обрабатывает ошибку запроса списка пользователей (повторится при следующем обновлении).
+
+        Args:
+            error: Исключение запроса
+        """
+        self.users_pending = False
+
+    def sync_messages(self) -> None:
+        """
+        Запрашивает у сервера только сообщения, появившиеся после последнего полученного.
+
+        До загрузки первой страницы истории запрос не выполняется, иначе
+        сервер вернул бы всю историю чата начиная с первого сообщения.
+        """
+        if self.sync_pending or (self.first_message_id is None and self.has_older_messages):
+            return
+        self.sync_pending = True
+        after_id: int = self.last_message_id
+
+        NETWORK.submit(lambda: API.messages(after_id), self.messages_synced, self.messages_sync_failed)
+
+    def messages_synced(self, answer: Dict[str, Any]) -> None:
+        """
+        Добавляет полученные сообщения и запрашивает следующую часть, если она есть.
+
+        Args:
+            answer: Ответ сервера на запрос /messages
+        """
+        self.sync_pending = False
+        self.receive_messages(answer.get('messages', []))
+        if answer.get('has_more', False):
+            self.sync_messages()
+        else:
+            self.start_listener()
+
+    def messages_sync_failed(self, error: Exception) -> None:
+        """
+        Обрабатывает ошибку запроса новых сообщений.
+
+        Слушатель обновлений все равно запускается: он переподключается
+        сам и получит пропущенные сообщения, когда сервер станет доступен.
+
+        Args:
+            error: Исключение запроса
+        """
+        self.sync_pending = False
+        self.start_listener()
+
+    def load_history(self) -> None:
+        """
+        Загружает страницу сообщений, предшествующих самому старому из загруженных.
+
+        Полная страница берется из локального кэша, если она там есть,
+        иначе запрашивается у сервера.
+        """
+        if self.history_pending:
+            return
+
+        if self.first_message_id is not None:
+            cached: List[Dict[str, Any]] = self.cache.last_messages(HISTORY_PAGE_SIZE, self.first_message_id)
+            if len(cached) == HISTORY_PAGE_SIZE:
+                self.prepend_history(cached)
+                return
+
+        self.history_pending = True
+
+        before_id: Optional[int] = self.first_message_id
+        NETWORK.submit(
+            lambda: API.history(HISTORY_PAGE_SIZE, before_id),
+            self.history_loaded,
+            self.history_load_failed
+        )
+
+    def history_loaded(self, answer: Dict[str, Any]) -> None:
+        """
+        Добавляет в чат полученную страницу истории.
+
+        После первой страницы запрашиваются сообщения, появившиеся после нее.
+
+        Args:
+            answer: Ответ сервера на запрос /history
+        """
+        self.history_pending = False
+        page: List[Dict[str, Any]] = answer.get('messages', [])
+        self.has_older_messages = answer.get('has_more', False)
+        initial: bool = self.first_message_id is None
+        self.cache.save_messages(page)
+
+        if page:
+            if initial:
+                self.loading_msg(page)
+                self.first_message_id = page[0]['id']
+            else:
+                self.prepend_history(page)
+
+        if initial:
+            self.sync_messages()
+
+    def prepend_history(self, page: List[Dict[str, Any]]) -> None:
+        """
+        Добавляет страницу истории над загруженными сообщениями, сохраняя положение прокрутки.
+
+        Args:
+            page: Сообщения, предшествующие самому старому из загруженных, по возрастанию ID
+        """
+        scrollbar = self.chat_view.verticalScrollBar()
+        self.scroll_anchor = scrollbar.maximum() - scrollbar.value()
+        self.chat_model.prepend_messages([self.chat_item(message) for message in page])
+        self.first_message_id = page[0]['id']
+
+    def history_load_failed(self, error: Exception) -> None:
+        """
+        Обрабатывает ошибку загрузки истории.
+
+        Первая страница запрашивается повторно через HISTORY_RETRY_INTERVAL
+        секунд; слушатель обновлений запускается только после ее загрузки.
+
+        Args:
+            error: Исключение запроса
+        """
+        self.history_pending = False
+        if self.first_message_id is None:
+            if not self.msb.isVisible():
+                self.msb.setText('Связь с сервером не установлена!')
+                self.msb.show()
+            QTimer.singleShot(HISTORY_RETRY_INTERVAL * 1000, self.retry_history)
+
+    def retry_history(self) -> None:
+        """Повторяет загрузку первой страницы истории, если окно чата еще открыто."""
+        if self.isVisible() and self.first_message_id is None:
+            self.load_history()
+
+    def on_chat_scrolled(self, value: int) -> None:
+        """
+        Подгружает старые сообщения, когда чат прокручен до самого верха.
+
+        Args:
+            value: Текущее положение полосы прокрутки
+        """
+        if (value == self.chat_view.verticalScrollBar().minimum()
+                and self.first_message_id is not None
+                and self.has_older_messages
+                and self.scroll_anchor is None):
+            self.load_history()
+
+    def on_chat_range_changed(self, minimum: int, maximum: int) -> None:
+        """
+        Сохраняет видимую позицию чата после добавления старых сообщений сверху.
+
+        Args:
+            minimum: Минимальное значение полосы прокрутки
+            maximum: Максимальное значение полосы прокрутки
+        """
+        if self.scroll_anchor is not None:
+            self.chat_view.verticalScrollBar().setValue(maximum - self.scroll_anchor)
+            self.scroll_anchor = None
+        elif maximum == minimum and self.first_message_id is not None and self.has_older_messages:
+            QTimer.singleShot(0, lambda: self.on_chat_scrolled(minimum))
+
+    def send_message(self) -> None:
+        """Отправляет сообщение в чат; кнопка отправки недоступна до ответа сервера."""
+        if self.message_line.text():
+            text: str = self.message_line.text()
+            token: str = self.main_user['token']
+
+            self.message_btn.setEnabled(False)
+            NETWORK.submit(
+                lambda: API.send_message(token, text),
+                self.message_sent,
+                self.message_send_failed
+            )
+
+    def message_sent(self, answer: Dict[str, Any]) -> None:
+        """
+        Обрабатывает ответ сервера на отправку сообщения.
+
+        Args:
+            answer: Ответ сервера на запрос /send_message
+        """
+        self.message_btn.setEnabled(True)
+        if not answer['answer']:
+            self.msb.setText(answer.get('error', 'Ошибка отправки!'))
+            self.msb.show()
+        else:
+            self.message_line.clear()
+            self.poller.activity()
+            if SYNC_MODE == 'poll':
+                self.sync_messages()
+
+    def message_send_failed(self, error: Exception) -> None:
+        """
+        Обрабатывает ошибку отправки сообщения.
+
+        Args:
+            error: Исключение запроса
+        """
+        self.message_btn.setEnabled(True)
+        self.msb.setText('Ошибка отправки!')
+        self.msb.show()
+
+    def search_messages(self) -> None:
+        """Начинает новый поиск сообщений по введенному тексту и фильтрам."""
+        self.search_generation += 1
+        self.search_results.clear()
+        self.search_offset = 0
+        if self.message_search_line.text().strip():
+            self.load_search_results()
+        else:
+            self.search_more_btn.hide()
+
+    def load_search_results(self) -> None:
+        """Запрашивает следующую страницу результатов поиска сообщений."""
+        if self.search_offset is None:
+            return
+
+        params: Dict[str, Union[str, int]] = {
+            'q': self.message_search_line.text(),
+            'limit': MESSAGE_SEARCH_PAGE_SIZE,
+            'offset': self.search_offset
+        }
+        if self.sender_search_line.text().strip():
+            params['sender'] = self.sender_search_line.text().strip()
+        if self.period_check.isChecked():
+            params['date_from'] = self.date_from_edit.date().toString(Qt.DateFormat.ISODate)
+            params['date_to'] = self.date_to_edit.date().toString(Qt.DateFormat.ISODate)
+
+        generation: int = self.search_generation
+        self.search_more_btn.hide()
+        NETWORK.submit(
+            lambda: API.search_messages(params),
+            lambda answer: self.show_search_results(generation, answer),
+            lambda error: self.search_failed(generation, error)
+        )
+
+    def show_search_results(self, generation: int, answer: Dict[str, Any]) -> None:
+        """
+        Отображает полученную страницу результатов поиска сообщений.
+
+        Args:
+            generation: Номер поиска, к которому относится ответ
+            answer: Ответ сервера на запрос /messages/search
+        """
+        if generation != self.search_generation:
+            return
+
+        found: List[Dict[str, Any]] = answer.get('messages', [])
+        if not found and self.search_offset == 0:
+            self.search_results.setHtml('<p style="color: #666;">Сообщения не найдены</p>')
+
+        for message in found:
+            self.search_results.append(
+                f'<p><b>{html.escape(message["sender"] or "Неизвестный")}</b> '
+                f'<span style="color: #666;">{html.escape(message["date"][:16])}</span><br>'
+                f'{message["snippet"]}</p>'
+            )
+
+        self.search_offset = answer.get('next_offset')
+        self.search_more_btn.setVisible(self.search_offset is not None)
+
+    def search_failed(self, generation: int, error: Exception) -> None:
+        """
+        Обрабатывает ошибку поиска сообщений.
+
+        Args:
+            generation: Номер поиска, к которому относится запрос
+            error: Исключение запроса
+        """
+        if generation != self.search_generation:
+            return
+        self.search_more_btn.setVisible(self.search_offset is not None)
+        self.msb.setText('Сервер недоступен!')
+        self.msb.show()
+
+    def scroll_to_bottom(self) -> None:
+        """Прокручивает чат до последнего сообщения."""
+        QtCore.QTimer.singleShot(0, self.chat_view.scrollToBottom)
+
+    def show_my_profile(self) -> None:
+        """Отображает модальное окно с профилем текущего пользователя."""
+        self.wind = UserProfileModal(
+            self.main_user['main_name'],
+            self.main_user['main_id'],
+            self.main_user['main_descr'],
+            True
+        )
+        self.wind.setWindowTitle('Мой профиль')
+        self.wind.show()
+
+    def receive_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Сохраняет в локальный кэш и добавляет в чат новые сообщения с сервера
+        (новые сообщения ускоряют опрос сервера).
+
+        Args:
+            messages: Сообщения, упорядоченные по возрастанию ID
+        """
+        if messages:
+            self.cache.save_messages(messages)
+            self.loading_msg(messages)
+            self.poller.activity()
+
+    def loading_msg(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Добавляет в чат новые сообщения, полученные с сервера.
+
+        Args:
+            messages: Сообщения, упорядоченные по возрастанию ID
+        """
+        new_items: List[Dict[str, Any]] = []
+        for message in messages:
+            if message['id'] <= self.last_message_id:
+                continue
+
+            new_items.append(self.chat_item(message))
+            self.last_message_id = message['id']
+
+        if new_items:
+            self.chat_model.append_messages(new_items)
+            self.scroll_to_bottom()
+            startup.mark('сообщения отображены')
+
+    def chat_item(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Преобразует сообщение в формате сервера в строку модели чата.
+
+        Args:
+            message: Сообщение с полями 'id', 'sender' и 'message'
+
+        Returns:
+            Dict[str, Any]: Строка модели с полями 'id', 'author', 'text' и 'is_mine'
+        """
+        sender_name = message.get('sender') or "Неизвестный"
+        return {
+            'id': message['id'],
+            'author': sender_name,
+            'text': message['message'],
+            'is_mine': sender_name == self.main_user['main_name']
+        }
+
+    def loading_users(self) -> None:
+        """
+        Синхронизирует карточки пользователей с данными сервера.
+
+        Карточки создаются только для новых пользователей, у существующих
+        обновляются изменившиеся поля, карточки удаленных пользователей удаляются.
+        """
+        self.user_order = []
+        for user_id, user in self.users.items():
+            name, info, state = user['name'], user['info'], user['state']
+            if str(name) == str(self.main_user['main_name']):
+                continue
+
+            self.user_order.append(user_id)
+            card = self.profiles.get(user_id)
+            if card is None:
+                card = Profile(name, user_id, info, state, self.scrollAreaWidgetContents_3)
+                card.hide()
+                self.profiles[user_id] = card
+            else:
+                card.update_data(name, info, state)
+            self.user_index.update(user_id, name, info)
+
+        current_ids = set(self.user_order)
+        for user_id in [user_id for user_id in self.profiles if user_id not in current_ids]:
+            self.profiles.pop(user_id).deleteLater()
+            self.user_index.remove(user_id)
+
+        self.search_users()
+
+    def search_users(self) -> None:
+        """Показывает карточки пользователей, подходящих под строку поиска, по релевантности."""
+        search_text = self.line_search.text().strip()
+        if search_text:
+            visible_ids: List[int] = self.user_index.search(search_text, USER_SEARCH_LIMIT)
+        else:
+            visible_ids = self.user_order
+
+        if visible_ids != self.visible_user_ids:
+            self.place_user_cards(visible_ids)
+
+        self.no_results_label.setVisible(bool(search_text) and not visible_ids)
+
+    def place_user_cards(self, visible_ids: List[int]) -> None:
+        """
+        Размещает карточки в сетке в два столбца без пересоздания виджетов.
+
+        Args:
+            visible_ids: ID пользователей, карточки которых нужно показать, в порядке отображения
+        """
+        while self.gridLayout.count():
+            self.gridLayout.takeAt(0)
+
+        visible = set(visible_ids)
+        for user_id, card in self.profiles.items():
+            if user_id not in visible:
+                card.hide()
+
+        for position, user_id in enumerate(visible_ids):
+            self.gridLayout.addWidget(self.profiles[user_id], position // 2, position % 2)
+            self.profiles[user_id].show()
+
+        if not visible_ids:
+            self.gridLayout.addWidget(self.no_results_label, 0, 0)
+        self.gridLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.visible_user_ids = visible_ids
+
+
+class Profile(QWidget, profile.Ui_UserCard):
+    """
+    Виджет карточки пользователя в списке.
+
+    Attributes:
+        open_modals: Статическая переменная для отслеживания открытых окон
+        name: Имя пользователя
+        id: ID пользователя
+        info: Информация о пользователе
+        state: Статус пользователя (online/offline)
+        modal: Модальное окно с детальной информацией о пользователе
+    """
+    open_modals = set()
+
+    def __init__(self, name: str, id: int, info: str, state: bool, parent: Optional[QWidget] = None):
+        """
+        Инициализирует виджет карточки пользователя.
+
+        Args:
+            name: Имя пользователя
+            id: ID пользователя
+            info: Информация о пользователе
+            state: Статус пользователя
+            parent: Родительский виджет
+        """
+        super().__init__(parent)
+        self.setupUi(self)
+        self.name = name
+        self.id = id
+        self.info = info
+        self.state = state
+        self.modal: Optional[UserProfileModal] = None
+        self.initUI()
+
+    def initUI(self) -> None:
+        """Инициализирует пользовательский интерфейс карточки пользователя."""
+        self.setFixedSize(304, 120)
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+        self.show_data()
+        self.detailsBtn.clicked.connect(self.open_details)
+
+    def update_data(self, name: str, info: str, state: bool) -> None:
+        """
+        Обновляет данные карточки, если они изменились.
+
+        Args:
+            name: Имя пользователя
+            info: Информация о пользователе
+            state: Статус пользователя
+        """
+        if (name, info, state) == (self.name, self.info, self.state):
+            return
+
+        self.name = name
+        self.info = info
+        self.state = state
+        self.show_data()
+
+    def show_data(self) -> None:
+        """Заполняет метки карточки данными пользователя."""
+        self.nameLabel.setText(self.name)
+        self.idLabel.setText(f"ID: {self.id}")
+
+        if len(self.info) > 50:
+            self.infoLabel.setText(self.info[:47] + "...")
+        else:
+            self.infoLabel.setText(self.info)
+
+        if self.state:
+            self.statusLabel.setText("● В сети")
+            self.statusLabel.setStyleSheet("font-size: 11px; color: #28a745;")
+        else:
+            self.statusLabel.setText("○ Не в сети")
+            self.statusLabel.setStyleSheet("font-size: 11px; color: #dc3545;")
+
+    def open_details(self) -> None:
+        """Открывает модальное окно с детальной информацией о пользователе."""
+        self.modal = UserProfileModal(self.name, self.id, self.info, self.state)
+        Profile.open_modals.add(self.modal)
+        self.modal.finished.connect(lambda: Profile.open_modals.discard(self.modal))
+        self.modal.show()
+
+
+class UserProfileModal(QDialog, modal_profile.Ui_UserProfileModal):
+    """
+    Модальное окно с детальной информацией о пользователе.
+
+    Attributes:
+        name: Имя пользователя
+        id: ID пользователя
+        info: Информация о пользователе
+        state: Статус пользователя (online/offline)
+    """
+
+    def __init__(self, name: str, id: int, info: str, state: bool):
+        """
+        Инициализирует модальное окно профиля пользователя.
+
+        Args:
+            name: Имя пользователя
+            id: ID пользователя
+            info: Информация о пользователе
+            state: Статус пользователя
+        """
+        super().__init__()
+        self.setupUi(self)
+        self.name = name
+        self.id = id
+        self.info = info
+        self.state = state
+        self.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self.setWindowTitle(f"Профиль {name}")
+        self.initUI()
+
+    def initUI(self) -> None:
+        """Инициализирует пользовательский интерфейс модального окна."""
+        self.modalNameLabel.setText(self.name)
+        self.modalIdLabel.setText(f"ID: {self.id}")
+        self.infoTextEdit.setText(self.info)
+
+        if self.state:
+            self.modalStatusLabel.setText("● В сети")
+            self.modalStatusLabel.setStyleSheet("font-size: 14px; color: #28a745; font-weight: bold;")
+        else:
+            self.modalStatusLabel.setText("○ Не в сети")
+            self.modalStatusLabel.setStyleSheet("font-size: 14px; color: #dc3545; font-weight: bold;")
+
+        self.modalCloseBtn.clicked.connect(self.close)
+        self.setFixedSize(400, 350)
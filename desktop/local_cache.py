@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+
+CACHE_DIR: str = os.environ.get('TSV_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tsv_chat'))
+"""Каталог локального кэша клиента."""
+
+SCHEMA: List[str] = [
+    'CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, sender TEXT, message TEXT, date TEXT)',
+    'CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT, info TEXT, state INTEGER)',
+]
+"""Таблицы кэша: сообщения и пользователи по ID на сервере."""
+
+
+def cache_path(server_url: str) -> str:
+    """
+    Возвращает путь к файлу кэша для сервера (у каждого сервера свой кэш).
+
+    Args:
+        server_url: Адрес сервера
+
+    Returns:
+        str: Путь к файлу SQLite в CACHE_DIR
+    """
+    digest: str = hashlib.sha1(server_url.encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f'cache-{digest}.sqlite3')
+
+
+class LocalCache:
+    """
+    Локальный кэш сообщений и пользователей в SQLite.
+
+    Сообщения сохраняются в том виде, в котором их возвращает сервер, и
+    пополняются только с краев загруженного диапазона (страницы истории
+    и новые сообщения), поэтому кэшированные ID идут без пропусков.
+    При запуске чат отображается из кэша, а с сервера запрашиваются только
+    сообщения после последнего кэшированного.
+
+    Если файл кэша нельзя открыть, кэш работает в памяти до закрытия клиента.
+
+    Attributes:
+        path: Путь к файлу кэша
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Открывает (при необходимости создает) кэш.
+
+        Args:
+            path: Путь к файлу кэша
+        """
+        self.path = path
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._connection: sqlite3.Connection = self.connect(path)
+        except (OSError, sqlite3.Error):
+            self.path = ':memory:'
+            self._connection = self.connect(self.path)
+
+    @staticmethod
+    def connect(path: str) -> sqlite3.Connection:
+        """
+        Открывает базу данных кэша и создает таблицы.
+
+        Args:
+            path: Путь к файлу или ':memory:'
+
+        Returns:
+            sqlite3.Connection: Соединение с кэшем
+        """
+        connection: sqlite3.Connection = sqlite3.connect(path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        return connection
+
+    def last_messages(self, limit: int, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Возвращает последние кэшированные сообщения.
+
+        Args:
+            limit: Максимальное количество сообщений
+            before_id: Вернуть только сообщения с ID меньше указанного
+
+        Returns:
+            List[Dict[str, Any]]: Сообщения в формате сервера по возрастанию ID
+        """
+        if before_id is None:
+            rows = self._connection.execute(
+                'SELECT id, sender, message, date FROM messages ORDER BY id DESC LIMIT ?', (limit,)
+            ).fetchall()
+        else:
+            rows = self._connection.execute(
+                'SELECT id, sender, message, date FROM messages WHERE id < ? ORDER BY id DESC LIMIT ?',
+                (before_id, limit)
+            ).fetchall()
+        return [
+            {'id': message_id, 'sender': sender, 'message': message, 'date': date}
+            for message_id, sender, message, date in reversed(rows)
+        ]
+
+    def save_messages(self, messages: Iterable[Dict[str, Any]]) -> None:
+        """
+        Сохраняет сообщения, полученные с сервера.
+
+        Args:
+            messages: Сообщения в формате сервера
+        """
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO messages (id, sender, message, date) VALUES (?, ?, ?, ?)',
+            [(message['id'], message['sender'], message['message'], message['date']) for message in messages]
+        )
+        self._connection.commit()
+
+    def clear_messages(self) -> None:
+        """Удаляет все кэшированные сообщения (если они не совпадают с данными сервера)."""
+        self._connection.execute('DELETE FROM messages')
+        self._connection.commit()
+
+    def users(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Возвращает кэшированных пользователей.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Записи пользователей по ID (статусы на момент сохранения)
+        """
+        rows = self._connection.execute('SELECT id, name, info, state FROM users ORDER BY id').fetchall()
+        return {
+            user_id: {'id': user_id, 'name': name, 'info': info, 'state': bool(state)}
+            for user_id, name, info, state in rows
+        }
+
+    def save_users(self, users: Iterable[Dict[str, Any]], replace_all: bool = False) -> None:
+        """
+        Сохраняет записи пользователей, полученные с сервера.
+
+        Args:
+            users: Записи пользователей {'id', 'name', 'info', 'state'}
+            replace_all: Передан полный список пользователей, остальные записи удаляются
+        """
+        if replace_all:
+            self._connection.execute('DELETE FROM users')
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO users (id, name, info, state) VALUES (?, ?, ?, ?)',
+            [(user['id'], user['name'], user['info'], int(user['state'])) for user in users]
+        )
+        self._connection.commit()
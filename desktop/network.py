@@ -0,0 +1,114 @@
+from typing import Any, Callable, Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+NETWORK_THREADS: int = 4
+"""Количество фоновых потоков, одновременно выполняющих запросы к серверу."""
+
+
+class RequestSignals(QObject):
+    """
+    Сигналы фонового запроса.
+
+    Attributes:
+        finished: Сигнал с результатом запроса
+        failed: Сигнал с исключением, которым завершился запрос
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class RequestTask(QRunnable):
+    """
+    Запрос к серверу, выполняемый в пуле потоков.
+
+    Attributes:
+        request: Функция, выполняющая запрос и разбирающая ответ
+        signals: Сигналы с результатом запроса
+    """
+
+    def __init__(self, request: Callable[[], Any]) -> None:
+        """
+        Инициализирует запрос.
+
+        Args:
+            request: Функция, выполняющая запрос; не должна обращаться к виджетам
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.request = request
+        self.signals: RequestSignals = RequestSignals()
+
+    def run(self) -> None:
+        """Выполняет запрос в фоновом потоке и передает результат сигналом."""
+        try:
+            result: Any = self.request()
+        except Exception as error:
+            self.signals.failed.emit(error)
+        else:
+            self.signals.finished.emit(result)
+
+
+class NetworkClient:
+    """
+    Выполняет запросы к серверу в фоновых потоках, не блокируя GUI-поток.
+
+    Результат запроса передается обработчику через сигнал, поэтому
+    обработчики вызываются в GUI-потоке и могут обновлять виджеты.
+
+    Attributes:
+        pool: Пул потоков, выполняющих запросы
+    """
+
+    def __init__(self, max_threads: int = NETWORK_THREADS) -> None:
+        """
+        Инициализирует клиент.
+
+        Args:
+            max_threads: Количество одновременно выполняемых запросов
+        """
+        self.pool: QThreadPool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._tasks: Set[RequestTask] = set()
+
+    def submit(self, request: Callable[[], Any],
+               on_finished: Optional[Callable[[Any], None]] = None,
+               on_failed: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        Ставит запрос в очередь пула потоков.
+
+        Args:
+            request: Функция, выполняющая запрос в фоновом потоке и возвращающая результат
+            on_finished: Вызывается в GUI-потоке с результатом запроса
+            on_failed: Вызывается в GUI-потоке с исключением (сетевая ошибка,
+                таймаут, некорректный ответ)
+        """
+        task: RequestTask = RequestTask(request)
+        self._tasks.add(task)
+
+        def finish(callback: Optional[Callable[[Any], None]], value: Any) -> None:
+            """Освобождает запрос и передает результат обработчику."""
+            self._tasks.discard(task)
+            if callback is not None:
+                callback(value)
+
+        task.signals.finished.connect(lambda result: finish(on_finished, result))
+        task.signals.failed.connect(lambda error: finish(on_failed, error))
+        self.pool.start(task)
+
+    def wait(self, timeout_ms: int) -> bool:
+        """
+        Ожидает завершения запросов (перед выходом из приложения).
+
+        Args:
+            timeout_ms: Максимальное время ожидания, в миллисекундах
+
+        Returns:
+            bool: True, если все запросы завершились
+        """
+        return self.pool.waitForDone(timeout_ms)
+
+
+NETWORK: NetworkClient = NetworkClient()
+"""Общий клиент фоновых запросов окон приложения."""
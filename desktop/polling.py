@@ -0,0 +1,109 @@
+import random
+from typing import Callable
+
+from PyQt6.QtCore import QTimer
+
+
+POLL_MIN_INTERVAL: int = 1000
+"""Интервал опроса сразу после активности пользователя или новых сообщений, в миллисекундах."""
+
+POLL_MAX_INTERVAL: int = 60000
+"""Максимальный интервал опроса при долгом простое, в миллисекундах."""
+
+POLL_BACKOFF: float = 2.0
+"""Множитель интервала опроса после каждого опроса без активности (1, 2, 4, ... 60 с)."""
+
+POLL_JITTER: float = 0.2
+"""Случайное отклонение интервала опроса (±20%), чтобы клиенты не опрашивали сервер одновременно."""
+
+
+class AdaptivePoller:
+    """
+    Планировщик периодического опроса сервера с адаптивным интервалом.
+
+    После активности (действия пользователя, новые сообщения) опрос идет
+    с минимальным интервалом, при простое интервал после каждого опроса
+    растет в POLL_BACKOFF раз до POLL_MAX_INTERVAL. Каждая задержка
+    случайно отклоняется на ±POLL_JITTER. На паузе (окно скрыто или
+    свернуто) опрос не выполняется.
+
+    Attributes:
+        poll: Функция опроса сервера
+        min_interval: Минимальный интервал опроса, в миллисекундах
+        max_interval: Максимальный интервал опроса, в миллисекундах
+        backoff: Множитель интервала при простое
+        jitter: Доля случайного отклонения интервала
+        interval: Текущий интервал опроса без учета отклонения, в миллисекундах
+        running: Выполняется ли опрос (False на паузе)
+        timer: Таймер следующего опроса
+    """
+
+    def __init__(self, poll: Callable[[], None], min_interval: int = POLL_MIN_INTERVAL,
+                 max_interval: int = POLL_MAX_INTERVAL, backoff: float = POLL_BACKOFF,
+                 jitter: float = POLL_JITTER) -> None:
+        """
+        Инициализирует планировщик (опрос начинается после resume()).
+
+        Args:
+            poll: Функция опроса сервера, вызывается в GUI-потоке
+            min_interval: Минимальный интервал опроса, в миллисекундах
+            max_interval: Максимальный интервал опроса, в миллисекундах
+            backoff: Множитель интервала при простое
+            jitter: Доля случайного отклонения интервала
+        """
+        self.poll = poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval: float = min_interval
+        self.running: bool = False
+
+        self.timer: QTimer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fire)
+
+    def next_delay(self) -> int:
+        """
+        Возвращает задержку до следующего опроса.
+
+        Returns:
+            int: Текущий интервал со случайным отклонением, в миллисекундах
+        """
+        return max(0, round(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)))
+
+    def fire(self) -> None:
+        """Выполняет опрос и планирует следующий с увеличенным интервалом."""
+        if not self.running:
+            return
+
+        self.poll()
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+        self.timer.start(self.next_delay())
+
+    def activity(self) -> None:
+        """
+        Сбрасывает интервал опроса до минимального.
+
+        Если следующий опрос запланирован позже минимального интервала,
+        он переносится на более раннее время.
+        """
+        self.interval = self.min_interval
+        if not self.running:
+            return
+
+        delay: int = self.next_delay()
+        if not self.timer.isActive() or self.timer.remainingTime() > delay:
+            self.timer.start(delay)
+
+    def resume(self) -> None:
+        """Возобновляет опрос с минимальным интервалом (окно показано или развернуто)."""
+        if self.running:
+            return
+        self.running = True
+        self.activity()
+
+    def pause(self) -> None:
+        """Приостанавливает опрос (окно скрыто, свернуто или закрыто)."""
+        self.running = False
+        self.timer.stop()
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+from typing import Set
+
+
+STARTED_AT: float = time.perf_counter()
+"""Момент начала загрузки клиента (импорт этого модуля первым в ui.py)."""
+
+STARTUP_TIMING: bool = os.environ.get('TSV_STARTUP_TIMING', '0') != '0'
+"""Выводить в stderr время этапов запуска клиента (TSV_STARTUP_TIMING=1)."""
+
+_marked: Set[str] = set()
+_last_mark: float = STARTED_AT
+
+
+def mark(stage: str) -> None:
+    """
+    Отмечает этап запуска в режиме STARTUP_TIMING.
+
+    Выводится время с начала загрузки клиента и с предыдущего этапа;
+    каждый этап отмечается только при первом достижении.
+
+    Args:
+        stage: Название этапа
+    """
+    global _last_mark
+    if not STARTUP_TIMING or stage in _marked:
+        return
+
+    now: float = time.perf_counter()
+    _marked.add(stage)
+    print(
+        f'[startup] {stage}: {(now - STARTED_AT) * 1000:.1f} мс (+{(now - _last_mark) * 1000:.1f} мс)',
+        file=sys.stderr,
+        flush=True
+    )
+    _last_mark = now
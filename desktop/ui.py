@@ -1,281 +1,59 @@
+import startup
+import importlib
 import sys
-from typing import List, Optional, Dict, Any, Union
+from typing import Any, Dict, Optional, Union
 from PyQt6 import QtCore, QtWidgets
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget,
-                             QLineEdit, QMessageBox, QLabel, QFrame, QTextBrowser,
-                             QVBoxLayout, QHBoxLayout, QSizePolicy, QDialog)
-from PyQt6.QtGui import QCloseEvent, QShowEvent
-import requests
-from requests.exceptions import ConnectionError
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication, QWidget, QLineEdit, QMessageBox, QLabel
 
-from user_interfaces import *
+from user_interfaces import choice, login, register
+from network import NETWORK
 
 
-class ChatWindow(QMainWindow, main_window.Ui_MainWindow):
-    """
-    Главное окно чата, отображающее сообщения и список пользователей.
-
-    Attributes:
-        window: Окно регистрации или авторизации
-        main_user: Данные текущего пользователя
-        wind: Окно профиля пользователя
-        msb: Всплывающее окно для отображения ошибок
-        chat_layout: Layout для отображения сообщений
-        data: Данные, полученные с сервера
-        update_timer: Таймер обновления данных
-    """
+EXIT_WAIT_MS: int = 3000
+"""Время ожидания незавершенных запросов (выхода из сети) при закрытии приложения, в миллисекундах."""
 
-    def __init__(self) -> None:
-        """Инициализирует главное окно чата."""
-        super().__init__()
-        self.setupUi(self)
-        self.initUI()
-
-        self.update_timer: QTimer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)
-
-        self.window: Optional[Union[RegisterWidget, LoginWidget]] = None
-        self.main_user: Optional[Dict[str, Union[str, int]]] = None
-        self.wind: Optional[UserProfileModal] = None
-        self.msb: QMessageBox = QMessageBox()
-        self.msb.setWindowTitle('Ошибка')
-        self.data: Dict[str, Any] = {}
-
-    def initUI(self) -> None:
-        """
-        Инициализирует пользовательский интерфейс главного окна.
-
-        Настраивает соединения сигналов со слотами и создает layout для сообщений.
-        """
-        self.message_btn.clicked.connect(self.send_message)
-        self.my_btn.clicked.connect(self.show_my_profile)
-        self.line_search.textChanged.connect(self.search_users)
+window_chat: Optional[Any] = None
+"""Главное окно чата; создается только после успешного входа или регистрации."""
 
-        self.chat_layout = QVBoxLayout(self.scrollAreaWidgetContents_2)
-        self.chat_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.chat_layout.setSpacing(4)
-        self.chat_layout.setContentsMargins(10, 10, 10, 10)
-        self.chat_layout.addStretch()
-
-    def showEvent(self, event: QShowEvent) -> None:
-        """
-        Обрабатывает событие показа окна.
-
-        Args:
-            event: Событие показа окна
-        """
-        try:
-            self.data = requests.get('http://127.0.0.1:5000/').json()
-            self.loading_msg()
-            self.loading_users()
-        except ConnectionError:
-            self.msb.setText('Связь с сервером не установлена!')
-            self.msb.show()
-
-    def closeEvent(self, event: QCloseEvent) -> None:
-        """
-        Обрабатывает событие закрытия окна.
-
-        Args:
-            event: Событие закрытия окна
-        """
-        self.update_timer.stop()
-        if self.main_user:
-            answer = requests.post('http://127.0.0.1:5000/change_state', json={'id': self.main_user['main_id']})
-
-    def update_data(self) -> None:
-        """Периодически обновляет сообщения и список пользователей"""
-        if self.main_user:
-            try:
-                self.data = requests.get('http://127.0.0.1:5000/').json()
-                self.loading_msg()
-
-                if self.line_search.text().strip() != "":
-                    self.search_users()
-                else:
-                    self.loading_users()
-            except ConnectionError:
-                pass
-
-    def send_message(self) -> None:
-        """Отправляет сообщение в чат."""
-        if self.message_line.text():
-            data: Dict[str, str] = {
-                'text': self.message_line.text(),
-                'username': self.main_user['main_name']
-            }
-
-            try:
-                answer = requests.post('http://127.0.0.1:5000/send_message', json=data).json()
-                if not answer['answer']:
-                    self.msb.setText('Ошибка отправки!')
-                    self.msb.show()
-                else:
-                    self.add_message_to_chat(self.message_line.text(), is_my_message=True)
-                    self.message_line.clear()
-            except ConnectionError:
-                self.msb.setText('Ошибка отправки!')
-                self.msb.show()
-
-    def add_message_to_chat(self, text: str, is_my_message: bool = True, author: Optional[str] = None) -> None:
-        """
-        Добавляет сообщение в чат.
-
-        Args:
-            text: Текст сообщения
-            is_my_message: Флаг, указывающий является ли сообщение своим
-            author: Автор сообщения (если не свой)
-        """
-        max_width = int(self.scroll_chat.width() // 2)
 
-        if is_my_message:
-            author = self.main_user['main_name']
-        elif author is None:
-            author = "Другой пользователь"
-
-        message_widget = ChatMessage(text, author, is_my_message, max_width)
+def chat_api() -> Any:
+    """
+    Возвращает общий клиент API.
 
-        message_container = QWidget()
-        message_container_layout = QHBoxLayout(message_container)
-        message_container_layout.setContentsMargins(0, 0, 0, 0)
+    Модуль api (вместе с requests) импортируется при первом запросе
+    в фоновом потоке, а не при запуске клиента.
 
-        if is_my_message:
-            message_container_layout.addStretch()
-            message_container_layout.addWidget(message_widget)
-        else:
-            message_container_layout.addWidget(message_widget)
-            message_container_layout.addStretch()
-
-        self.chat_layout.insertWidget(self.chat_layout.count() - 1, message_container)
-        self.scroll_to_bottom()
-
-    def scroll_to_bottom(self) -> None:
-        """Прокручивает чат до последнего сообщения."""
-        scrollbar = self.scroll_chat.verticalScrollBar()
-        QtCore.QTimer.singleShot(100, lambda: scrollbar.setValue(scrollbar.maximum()))
-
-    def show_my_profile(self) -> None:
-        """Отображает модальное окно с профилем текущего пользователя."""
-        self.wind = UserProfileModal(
-            self.main_user['main_name'],
-            self.main_user['main_id'],
-            self.main_user['main_descr'],
-            True
-        )
-        self.wind.setWindowTitle('Мой профиль')
-        self.wind.show()
-
-    def search_users(self) -> None:
-        """Выполняет поиск пользователей по введенному тексту."""
-        if self.has_open_profile_modals():
-            return
-
-        search_text = self.line_search.text().strip().lower()
-        names = self.data.get('names', [])
-        information = self.data.get('infos', [])
-        ids = self.data.get('ids', [])
-        states = self.data.get('states', [])
-
-        grid_layout = self.scrollAreaWidgetContents_3.findChild(QtWidgets.QGridLayout, "gridLayout")
-        if grid_layout:
-            while grid_layout.count():
-                child = grid_layout.takeAt(0)
-                if child.widget():
-                    child.widget().deleteLater()
-
-            if search_text == "":
-                for i in range(len(names)):
-                    if i < len(information) and i < len(ids) and i < len(states):
-                        if str(names[i]) != str(self.main_user['main_name']):
-                            self.add_profile(names[i], information[i], ids[i], states[i])
-            else:
-                found_any = False
-                for i in range(len(names)):
-                    if i < len(information) and i < len(ids) and i < len(states):
-                        if str(names[i]) != str(self.main_user['main_name']):
-                            if search_text in names[i].lower():
-                                self.add_profile(names[i], information[i], ids[i], states[i])
-                                found_any = True
-
-                if not found_any:
-                    no_results_label = QLabel("Пользователи не найдены")
-                    no_results_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    no_results_label.setStyleSheet("""
-                        QLabel {
-                            color: #666;
-                            font-size: 14px;
-                            padding: 20px;
-                        }
-                    """)
-                    grid_layout.addWidget(no_results_label, 0, 0)
-
-    def add_profile(self, name: str, info: str, id: int, state: bool) -> None:
-        """
-        Добавляет виджет профиля пользователя в список.
+    Returns:
+        ChatApi: Общий клиент API
+    """
+    return importlib.import_module('api').API
 
-        Args:
-            name: Имя пользователя
-            info: Информация о пользователе
-            id: ID пользователя
-            state: Статус пользователя (online/offline)
-        """
-        profile = Profile(name, id, info, state, self.scrollAreaWidgetContents_3)
-        grid_layout = self.scrollAreaWidgetContents_3.findChild(QtWidgets.QGridLayout, "gridLayout")
-
-        if grid_layout is not None:
-            current_count = grid_layout.count()
-            row = current_count // 2
-            col = current_count % 2
-
-            grid_layout.addWidget(profile, row, col)
-            grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-
-    def loading_msg(self) -> None:
-        """Загружает и отображает сообщения из чата."""
-        messages = self.data.get('messages', [])
-        senders = self.data.get('sender_users', [])
-
-        for i in reversed(range(self.chat_layout.count() - 1)):
-            item = self.chat_layout.itemAt(i)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widget.setParent(None)
-
-        for i in range(len(messages)):
-            if i < len(senders) and senders[i] == self.main_user['main_name']:
-                self.add_message_to_chat(messages[i], is_my_message=True)
-            else:
-                sender_name = senders[i] if i < len(senders) else "Неизвестный"
-                self.add_message_to_chat(messages[i], is_my_message=False, author=sender_name)
 
-    def loading_users(self) -> None:
-        """Загружает и отображает список пользователей."""
-        if self.has_open_profile_modals() or self.line_search.text().strip() != "":
-            return
+def preload_chat() -> None:
+    """Импортирует модули окна чата в фоновом потоке, пока пользователь вводит данные."""
+    NETWORK.submit(lambda: importlib.import_module('chat_window'))
 
-        names = self.data.get('names', [])
-        information = self.data.get('infos', [])
-        ids: List[str] = self.data.get('ids', [])
-        states = self.data.get('states', [])
 
-        grid_layout = self.scrollAreaWidgetContents_3.findChild(QtWidgets.QGridLayout, "gridLayout")
-        if grid_layout:
-            while grid_layout.count():
-                child = grid_layout.takeAt(0)
-                if child.widget():
-                    child.widget().deleteLater()
+def open_chat(answer: Dict[str, Union[bool, int, str]]) -> None:
+    """
+    Создает и показывает главное окно чата после успешного входа или регистрации.
 
-        for i in range(len(names)):
-            if i < len(information) and i < len(ids) and i < len(states):
-                if str(names[i]) != str(self.main_user['main_name']):
-                    self.add_profile(names[i], information[i], ids[i], states[i])
+    Args:
+        answer: Ответ сервера с данными пользователя и токеном сессии
+    """
+    global window_chat
+    startup.mark('вход выполнен')
+    from chat_window import ChatWindow
 
-    def has_open_profile_modals(self) -> bool:
-        """Проверяет, есть ли открытые модальные окна профилей других пользователей."""
-        return len(Profile.open_modals) > 0
+    window_chat = ChatWindow()
+    window_chat.main_user = {
+        'main_name': answer['main_name'],
+        'main_descr': answer['main_info'],
+        'main_id': answer['main_id'],
+        'token': answer['token']
+    }
+    window_chat.show()
 
 
 class RegisterWidget(QWidget, register.Ui_Form):
@@ -321,33 +99,16 @@ class RegisterWidget(QWidget, register.Ui_Form):
             if self.password_line.text():
                 if self.description.toPlainText():
                     if self.try_line.text() and self.try_line.text() == self.password_line.text():
-                        data: Dict[str, str] = {
-                            "username": self.name_line.text(),
-                            "password": self.password_line.text(),
-                            "user_info": self.description.toPlainText(),
-                        }
-
-                        try:
-                            answer: Dict[str, Union[bool, int, str]] = requests.post(
-                                "http://127.0.0.1:5000/register",
-                                json=data
-                            ).json()
-
-                            if answer['answer']:
-                                window_chat.main_user = {
-                                    'main_name': answer['main_name'],
-                                    'main_descr': answer['main_info'],
-                                    'main_id': answer['main_id']
-                                }
-                                window_chat.show()
-                                self.close()
-                            else:
-                                self.msb.setText('Ошибка со стороны сервера!')
-                                self.msb.show()
-
-                        except ConnectionError:
-                            self.msb.setText('Сервер недоступен!')
-                            self.msb.show()
+                        username: str = self.name_line.text()
+                        password: str = self.password_line.text()
+                        user_info: str = self.description.toPlainText()
+
+                        self.register_btn.setEnabled(False)
+                        NETWORK.submit(
+                            lambda: chat_api().register(username, password, user_info),
+                            self.registered,
+                            self.request_failed
+                        )
 
                     else:
                         if not self.try_line.text():
@@ -366,6 +127,32 @@ class RegisterWidget(QWidget, register.Ui_Form):
             self.name_line.setStyleSheet("border: 1px solid red;")
             self.label.setStyleSheet("color: red")
 
+    def registered(self, answer: Dict[str, Union[bool, int, str]]) -> None:
+        """
+        Обрабатывает ответ сервера на регистрацию.
+
+        Args:
+            answer: Ответ сервера на запрос /register
+        """
+        self.register_btn.setEnabled(True)
+        if answer['answer']:
+            open_chat(answer)
+            self.close()
+        else:
+            self.msb.setText(answer.get('error', 'Ошибка со стороны сервера!'))
+            self.msb.show()
+
+    def request_failed(self, error: Exception) -> None:
+        """
+        Обрабатывает ошибку запроса регистрации.
+
+        Args:
+            error: Исключение запроса
+        """
+        self.register_btn.setEnabled(True)
+        self.msb.setText('Сервер недоступен!')
+        self.msb.show()
+
 
 class LoginWidget(QWidget, login.Ui_Form):
     """
@@ -405,31 +192,15 @@ class LoginWidget(QWidget, login.Ui_Form):
 
         if self.name_line.text():
             if self.password_line.text():
-                data: Dict[str, str] = {
-                    'username': self.name_line.text(),
-                    'password': self.password_line.text()
-                }
-
-                try:
-                    answer: Dict[str, Union[bool, int, str]] = requests.get(
-                        "http://127.0.0.1:5000/login",
-                        json=data
-                    ).json()
-
-                    if answer['answer']:
-                        window_chat.main_user = {
-                            'main_name': answer['main_name'],
-                            'main_descr': answer['main_info'],
-                            'main_id': answer['main_id']
-                        }
-                        window_chat.show()
-                        self.close()
-                    else:
-                        self.msb.setText('Неверное имя пользователя или пароль!')
-                        self.msb.show()
-                except ConnectionError:
-                    self.msb.setText('Сервер недоступен!')
-                    self.msb.show()
+                username: str = self.name_line.text()
+                password: str = self.password_line.text()
+
+                self.login_btn.setEnabled(False)
+                NETWORK.submit(
+                    lambda: chat_api().login(username, password),
+                    self.logged_in,
+                    self.request_failed
+                )
 
             else:
                 self.password_line.setStyleSheet("border: 1px solid red;")
@@ -438,255 +209,65 @@ class LoginWidget(QWidget, login.Ui_Form):
             self.name_line.setStyleSheet("border: 1px solid red;")
             self.label.setStyleSheet("color: red")
 
-
-class ChoiceWidget(QWidget, choice.Ui_Form):
-    """Виджет выбора между регистрацией и авторизацией."""
-
-    def __init__(self) -> None:
-        """Инициализирует виджет выбора."""
-        super().__init__()
-        self.setupUi(self)
-        self.initUI()
-
-    def initUI(self) -> None:
-        """Инициализирует пользовательский интерфейс виджета выбора."""
-        self.setFixedSize(400, 132)
-
-        self.reg_btn.clicked.connect(self.click)
-        self.log_btn.clicked.connect(self.click)
-
-    def click(self) -> None:
-        """Обрабатывает нажатие кнопки регистрации или авторизации."""
-        if self.sender().objectName() == 'reg_btn':
-            window_chat.window = RegisterWidget()
-        else:
-            window_chat.window = LoginWidget()
-
-        window_chat.window.show()
-        self.close()
-
-
-class Profile(QWidget, profile.Ui_UserCard):
-    """
-    Виджет карточки пользователя в списке.
-
-    Attributes:
-        open_modals: Статическая переменная для отслеживания открытых окон
-        name: Имя пользователя
-        id: ID пользователя
-        info: Информация о пользователе
-        state: Статус пользователя (online/offline)
-        modal: Модальное окно с детальной информацией о пользователе
-    """
-    open_modals = set()
-
-    def __init__(self, name: str, id: int, info: str, state: bool, parent: Optional[QWidget] = None):
+    def logged_in(self, answer: Dict[str, Union[bool, int, str]]) -> None:
         """
-        Инициализирует виджет карточки пользователя.
+        Обрабатывает ответ сервера на попытку входа.
 
         Args:
-            name: Имя пользователя
-            id: ID пользователя
-            info: Информация о пользователе
-            state: Статус пользователя
-            parent: Родительский виджет
+            answer: Ответ сервера на запрос /login
         """
-        super().__init__(parent)
-        self.setupUi(self)
-        self.name = name
-        self.id = id
-        self.info = info
-        self.state = state
-        self.modal: Optional[UserProfileModal] = None
-        self.initUI()
-
-    def initUI(self) -> None:
-        """Инициализирует пользовательский интерфейс карточки пользователя."""
-        self.setFixedSize(304, 120)
-        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-
-        self.nameLabel.setText(self.name)
-        self.idLabel.setText(f"ID: {self.id}")
-
-        if len(self.info) > 50:
-            self.infoLabel.setText(self.info[:47] + "...")
-        else:
-            self.infoLabel.setText(self.info)
-
-        if self.state:
-            self.statusLabel.setText("● В сети")
-            self.statusLabel.setStyleSheet("font-size: 11px; color: #28a745;")
+        self.login_btn.setEnabled(True)
+        if answer['answer']:
+            open_chat(answer)
+            self.close()
         else:
-            self.statusLabel.setText("○ Не в сети")
-            self.statusLabel.setStyleSheet("font-size: 11px; color: #dc3545;")
-
-        self.detailsBtn.clicked.connect(self.open_details)
-
-    def open_details(self) -> None:
-        """Открывает модальное окно с детальной информацией о пользователе."""
-        self.modal = UserProfileModal(self.name, self.id, self.info, self.state)
-        Profile.open_modals.add(self.modal)
-        self.modal.finished.connect(lambda: Profile.open_modals.discard(self.modal))
-        self.modal.show()
-
-
-class UserProfileModal(QDialog, modal_profile.Ui_UserProfileModal):
-    """
-    Модальное окно с детальной информацией о пользователе.
-
-    Attributes:
-        name: Имя пользователя
-        id: ID пользователя
-        info: Информация о пользователе
-        state: Статус пользователя (online/offline)
-    """
+            self.msb.setText('Неверное имя пользователя или пароль!')
+            self.msb.show()
 
-    def __init__(self, name: str, id: int, info: str, state: bool):
+    def request_failed(self, error: Exception) -> None:
         """
-        Инициализирует модальное окно профиля пользователя.
+        Обрабатывает ошибку запроса входа.
 
         Args:
-            name: Имя пользователя
-            id: ID пользователя
-            info: Информация о пользователе
-            state: Статус пользователя
+            error: Исключение запроса
         """
-        super().__init__()
-        self.setupUi(self)
-        self.name = name
-        self.id = id
-        self.info = info
-        self.state = state
-        self.setWindowModality(Qt.WindowModality.ApplicationModal)
-        self.setWindowTitle(f"Профиль {name}")
-        self.initUI()
+        self.login_btn.setEnabled(True)
+        self.msb.setText('Сервер недоступен!')
+        self.msb.show()
 
-    def initUI(self) -> None:
-        """Инициализирует пользовательский интерфейс модального окна."""
-        self.modalNameLabel.setText(self.name)
-        self.modalIdLabel.setText(f"ID: {self.id}")
-        self.infoTextEdit.setText(self.info)
-
-        if self.state:
-            self.modalStatusLabel.setText("● В сети")
-            self.modalStatusLabel.setStyleSheet("font-size: 14px; color: #28a745; font-weight: bold;")
-        else:
-            self.modalStatusLabel.setText("○ Не в сети")
-            self.modalStatusLabel.setStyleSheet("font-size: 14px; color: #dc3545; font-weight: bold;")
-
-        self.modalCloseBtn.clicked.connect(self.close)
-        self.setFixedSize(400, 350)
 
-
-class ChatMessage(QWidget):
+class ChoiceWidget(QWidget, choice.Ui_Form):
     """
-    Виджет сообщения в чате.
+    Виджет выбора между регистрацией и авторизацией.
 
     Attributes:
-        is_my_message: Флаг, указывающий является ли сообщение своим
-        max_width: Максимальная ширина сообщения
-        author: Автор сообщения
-        text: Текст сообщения
-        author_label: Метка с именем автора (для чужих сообщений)
-        text_browser: Виджет для отображения текста сообщения
+        window: Окно регистрации или авторизации
     """
 
-    def __init__(self, text: str, author: str, is_my_message: bool = True, max_width: int = 300):
-        """
-        Инициализирует виджет сообщения.
-
-        Args:
-            text: Текст сообщения
-            author: Автор сообщения
-            is_my_message: Флаг, указывающий является ли сообщение своим
-            max_width: Максимальная ширина сообщения
-        """
+    def __init__(self) -> None:
+        """Инициализирует виджет выбора."""
         super().__init__()
-        self.is_my_message = is_my_message
-        self.max_width = max_width
-        self.author = author
-        self.text = text
-        self.author_label: Optional[QLabel] = None
-        self.text_browser: Optional[QTextBrowser] = None
+        self.setupUi(self)
         self.initUI()
 
-    def initUI(self) -> None:
-        """Инициализирует пользовательский интерфейс виджета сообщения."""
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(2)
-
-        if not self.is_my_message:
-            self.author_label = QLabel(self.author)
-            self.author_label.setStyleSheet("""
-                QLabel {
-                    color: #666;
-                    font-size: 11px;
-                    padding: 0px 5px;
-                }
-            """)
-            self.author_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            layout.addWidget(self.author_label)
-
-        self.text_browser = QTextBrowser()
-        self.text_browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.text_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.text_browser.setFrameShape(QFrame.Shape.NoFrame)
-        self.text_browser.setReadOnly(True)
-
-        if self.is_my_message:
-            self.text_browser.setStyleSheet("""
-                QTextBrowser {
-                    background-color: #0084ff;
-                    color: white;
-                    border-radius: 12px;
-                    padding: 8px 12px;
-                    margin: 0px;
-                }
-            """)
-        else:
-            self.text_browser.setStyleSheet("""
-                QTextBrowser {
-                    background-color: grey;
-                    color: black;
-                    border-radius: 12px;
-                    padding: 8px 12px;
-                    margin: 0px;
-                }
-            """)
-
-        layout.addWidget(self.text_browser)
-        self.set_message(self.text)
-
-    def set_message(self, text: str) -> None:
-        """
-        Устанавливает текст сообщения.
-
-        Args:
-            text: Текст сообщения
-        """
-        if self.text_browser:
-            self.text_browser.setText(text)
-            self.adjust_size()
-
-    def adjust_size(self) -> None:
-        """Настраивает размер виджета сообщения в соответствии с содержимым."""
-        if not self.text_browser:
-            return
-
-        doc = self.text_browser.document()
-        doc.setTextWidth(self.max_width)
+        self.window: Optional[Union[RegisterWidget, LoginWidget]] = None
 
-        ideal_width = min(doc.idealWidth() + 25, self.max_width)
-        text_height = int(doc.size().height()) + 20
+    def initUI(self) -> None:
+        """Инициализирует пользовательский интерфейс виджета выбора."""
+        self.setFixedSize(400, 132)
 
-        self.text_browser.setFixedSize(int(ideal_width), text_height)
+        self.reg_btn.clicked.connect(self.click)
+        self.log_btn.clicked.connect(self.click)
 
-        if self.is_my_message:
-            self.setFixedSize(int(ideal_width) + 10, text_height)
+    def click(self) -> None:
+        """Обрабатывает нажатие кнопки регистрации или авторизации."""
+        if self.sender().objectName() == 'reg_btn':
+            self.window = RegisterWidget()
         else:
-            author_height = 15
-            self.setFixedSize(int(ideal_width) + 10, text_height + author_height)
+            self.window = LoginWidget()
+
+        self.window.show()
+        self.close()
 
 
 if hasattr(QtCore.Qt, 'AA_EnableHighDpiScaling'):
@@ -700,9 +281,15 @@ if __name__ == '__main__':
     Точка входа в приложение.
 
     Создает и отображает начальное окно выбора (регистрация/авторизация).
+    Окно чата, его таймеры и сетевые модули создаются только после входа;
+    с TSV_STARTUP_TIMING=1 время этапов запуска выводится в stderr.
     """
+    startup.mark('модули загружены')
     app = QApplication(sys.argv)
-    window_chat: ChatWindow = ChatWindow()
     window_choice: ChoiceWidget = ChoiceWidget()
     window_choice.show()
-    sys.exit(app.exec())
+    QTimer.singleShot(0, lambda: startup.mark('окно выбора показано'))
+    QTimer.singleShot(0, preload_chat)
+    exit_code: int = app.exec()
+    NETWORK.wait(EXIT_WAIT_MS)
+    sys.exit(exit_code)
@@ -0,0 +1,243 @@
+import heapq
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+
+TRIE_DEPTH: int = 2
+"""
+Глубина префиксного дерева. Запросы длиннее обслуживает индекс триграмм:
+любое совпадение префикса слова является и совпадением подстроки.
+"""
+
+
+class TrieNode:
+    """
+    Узел префиксного дерева.
+
+    Attributes:
+        children: Дочерние узлы по следующему символу
+        ids: ID пользователей, у которых есть слово с префиксом этого узла
+    """
+    __slots__ = ('children', 'ids')
+
+    def __init__(self) -> None:
+        """Инициализирует пустой узел."""
+        self.children: Dict[str, 'TrieNode'] = {}
+        self.ids: Set[int] = set()
+
+
+class UserSearchIndex:
+    """
+    Индекс для поиска пользователей на клиенте.
+
+    Префиксное дерево по имени и словам имени отвечает на запросы короче
+    трех символов, индекс триграмм по имени (и, при необходимости, по описанию) —
+    на более длинные. Индекс обновляется по одному пользователю, без перестроения.
+
+    Attributes:
+        include_info: Искать ли подстроку также в описании пользователя
+    """
+
+    def __init__(self, include_info: bool = True) -> None:
+        """
+        Инициализирует пустой индекс.
+
+        Args:
+            include_info: Искать ли подстроку также в описании пользователя
+        """
+        self.include_info = include_info
+        self._root: TrieNode = TrieNode()
+        self._name_trigrams: Dict[str, Set[int]] = {}
+        self._info_trigrams: Dict[str, Set[int]] = {}
+        self._users: Dict[int, Tuple[str, str]] = {}
+        self._words: Dict[int, Set[str]] = {}
+
+    @staticmethod
+    def words(name: str) -> Set[str]:
+        """
+        Возвращает слова, по префиксам которых ищется пользователь.
+
+        Args:
+            name: Имя пользователя в нижнем регистре
+
+        Returns:
+            Set[str]: Имя целиком и его части, разделенные пробелами, '_', '-' и '.'
+        """
+        return {name, *[word for word in re.split(r'[\s_.\-]+', name) if word]}
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        """
+        Возвращает триграммы строки.
+
+        Args:
+            text: Строка в нижнем регистре
+
+        Returns:
+            Set[str]: Все подстроки длины 3
+        """
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def update(self, user_id: int, name: str, info: str = '') -> None:
+        """
+        Добавляет пользователя в индекс или обновляет его данные.
+
+        Args:
+            user_id: ID пользователя
+            name: Имя пользователя
+            info: Информация о пользователе
+        """
+        entry: Tuple[str, str] = (name.lower(), info.lower() if self.include_info else '')
+        if self._users.get(user_id) == entry:
+            return
+
+        self.remove(user_id)
+        self._users[user_id] = entry
+        self._words[user_id] = self.words(entry[0])
+
+        for word in self._words[user_id]:
+            node = self._root
+            for char in word[:TRIE_DEPTH]:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = TrieNode()
+                child.ids.add(user_id)
+                node = child
+
+        for trigrams, text in ((self._name_trigrams, entry[0]), (self._info_trigrams, entry[1])):
+            for trigram in self.trigrams(text):
+                ids = trigrams.get(trigram)
+                if ids is None:
+                    ids = trigrams[trigram] = set()
+                ids.add(user_id)
+
+    def remove(self, user_id: int) -> None:
+        """
+        Удаляет пользователя из индекса.
+
+        Args:
+            user_id: ID пользователя
+        """
+        entry: Optional[Tuple[str, str]] = self._users.pop(user_id, None)
+        if entry is None:
+            return
+
+        for word in self._words.pop(user_id):
+            path: List[Tuple[TrieNode, str]] = []
+            node = self._root
+            for char in word[:TRIE_DEPTH]:
+                child = node.children.get(char)
+                if child is None:
+                    break
+                child.ids.discard(user_id)
+                path.append((node, char))
+                node = child
+            for parent, char in reversed(path):
+                if parent.children[char].ids:
+                    break
+                del parent.children[char]
+
+        for trigrams, text in ((self._name_trigrams, entry[0]), (self._info_trigrams, entry[1])):
+            for trigram in self.trigrams(text):
+                ids = trigrams.get(trigram)
+                if ids is not None:
+                    ids.discard(user_id)
+                    if not ids:
+                        del trigrams[trigram]
+
+    def prefix_ids(self, prefix: str) -> Set[int]:
+        """
+        Возвращает пользователей, у которых имя или слово имени начинается с префикса.
+
+        Args:
+            prefix: Префикс в нижнем регистре длиной не больше TRIE_DEPTH
+
+        Returns:
+            Set[int]: ID найденных пользователей
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def substring_ids(self, text: str, in_info: bool = False) -> Set[int]:
+        """
+        Возвращает пользователей, в имени (или описании) которых есть подстрока.
+
+        Кандидаты отбираются пересечением множеств по триграммам запроса
+        и затем проверяются, чтобы отсеять ложные совпадения.
+
+        Args:
+            text: Подстрока в нижнем регистре длиной от трех символов
+            in_info: Искать в описании вместо имени
+
+        Returns:
+            Set[int]: ID найденных пользователей
+        """
+        trigrams = self._info_trigrams if in_info else self._name_trigrams
+        posting_lists = sorted(
+            (trigrams.get(trigram, set()) for trigram in self.trigrams(text)),
+            key=len
+        )
+        if not posting_lists or not posting_lists[0]:
+            return set()
+
+        candidates: Set[int] = set(posting_lists[0])
+        for ids in posting_lists[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+
+        field = 1 if in_info else 0
+        return {user_id for user_id in candidates if text in self._users[user_id][field]}
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """
+        Ищет пользователей и упорядочивает их по релевантности.
+
+        Сначала идут точные совпадения имени, затем совпадения префикса имени,
+        префикса слова имени, подстроки имени и подстроки описания.
+
+        Args:
+            query: Строка поиска
+            limit: Максимальное количество результатов
+
+        Returns:
+            List[int]: ID найденных пользователей
+        """
+        text = query.strip().lower()
+        if not text:
+            return []
+
+        users = self._users
+        if len(text) > TRIE_DEPTH:
+            candidates: Set[int] = self.substring_ids(text)
+        else:
+            candidates = self.prefix_ids(text)
+
+        tiers: List[Set[int]] = [set(), set(), set()]
+        for user_id in candidates:
+            name = users[user_id][0]
+            if name.startswith(text):
+                tiers[0].add(user_id)
+            elif any(word.startswith(text) for word in self._words[user_id]):
+                tiers[1].add(user_id)
+            else:
+                tiers[2].add(user_id)
+
+        if len(text) > TRIE_DEPTH and self.include_info and len(candidates) < limit:
+            tiers.append(self.substring_ids(text, in_info=True) - candidates)
+
+        results: List[int] = []
+        for tier in tiers:
+            if len(results) >= limit:
+                break
+            results += [
+                user_id for _, _, user_id in heapq.nsmallest(
+                    limit - len(results),
+                    ((len(users[user_id][0]), users[user_id][0], user_id) for user_id in tier)
+                )
+            ]
+        return results